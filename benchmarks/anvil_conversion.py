@@ -0,0 +1,49 @@
+#########################################################
+#  ____           _                                     #
+# |  _ \ ___   __| |_ __ _   _ _ __ ___                 #
+# | |_) / _ \ / _` | '__| | | | '_ ` _ \                #
+# |  __/ (_) | (_| | |  | |_| | | | | | |               #
+# |_|   \___/ \__,_|_|   \__,_|_| |_| |_|               #
+#                                                       #
+# Copyright 2021 Podrum Team.                           #
+#                                                       #
+# This file is licensed under the GPL v2.0 license.     #
+# The license file is located in the root directory     #
+# of the source code. If not you may not use this file. #
+#                                                       #
+#########################################################
+
+# Measures how many chunks per second the anvil providers
+# convert, run it with: python3 benchmarks/anvil_conversion.py [radius]
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from podrum.block.block_map import block_map
+from podrum.world.generator.default import default
+from podrum.world.provider.anvil.anvil import anvil
+from podrum.world.provider.pm_anvil.pm_anvil import pm_anvil
+
+def benchmark(name: str, function: object, chunks: list) -> list:
+    start: float = time.perf_counter()
+    result: list = [function(chunk) for chunk in chunks]
+    elapsed: float = time.perf_counter() - start
+    print(f"{name}: {len(chunks) / elapsed:.2f} chunks/s ({elapsed * 1000 / len(chunks):.2f} ms/chunk)")
+    return result
+
+if __name__ == "__main__":
+    if not hasattr(block_map, "states_1"):
+        block_map.load_map()
+    radius: int = int(sys.argv[1]) if len(sys.argv) > 1 else 2
+    runtime_ids: tuple = default.get_runtime_ids()
+    chunks: list = []
+    for x in range(-radius, radius + 1):
+        for z in range(-radius, radius + 1):
+            chunks.append(default.generate_chunk(x, z, runtime_ids))
+    print(f"{len(chunks)} generated chunks")
+    for provider in [anvil, pm_anvil]:
+        anvil_chunks: list = benchmark(f"{provider.provider_name} to_anvil_chunk", provider.to_anvil_chunk, chunks)
+        benchmark(f"{provider.provider_name} to_server_chunk", provider.to_server_chunk, anvil_chunks)
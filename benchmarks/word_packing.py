@@ -0,0 +1,121 @@
+#########################################################
+#  ____           _                                     #
+# |  _ \ ___   __| |_ __ _   _ _ __ ___                 #
+# | |_) / _ \ / _` | '__| | | | '_ ` _ \                #
+# |  __/ (_) | (_| | |  | |_| | | | | | |               #
+# |_|   \___/ \__,_|_|   \__,_|_| |_| |_|               #
+#                                                       #
+# Copyright 2021 Podrum Team.                           #
+#                                                       #
+# This file is licensed under the GPL v2.0 license.     #
+# The license file is located in the root directory     #
+# of the source code. If not you may not use this file. #
+#                                                       #
+#########################################################
+
+# Checks that chunk_utils.pack_words and unpack_words match the
+# word packing block_storage used before them, byte for byte, and
+# measures both, run it with: python3 benchmarks/word_packing.py
+
+from array import array
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from binary_utils.binary_stream import binary_stream
+from podrum.world.chunk.block_storage import block_storage
+from podrum.world.chunk_utils import chunk_utils
+
+bits_per_block_values: list = [1, 2, 3, 4, 5, 6, 8, 16]
+
+# The packing block_storage.network_serialize used to do.
+def reference_pack_words(blocks: object, bits_per_block: int) -> bytes:
+    stream: object = binary_stream()
+    blocks_per_word: int = math.floor(32 / bits_per_block)
+    words_per_chunk: int = math.ceil(4096 / blocks_per_word)
+    pos: int = 0
+    for chunk in range(0, words_per_chunk):
+        word: int = 0
+        for block in range(0, blocks_per_word):
+            if pos >= 4096:
+                break
+            state: int = blocks[pos]
+            word |= state << (bits_per_block * block)
+            pos += 1
+        stream.write_unsigned_int_le(word)
+    return stream.data
+
+# The unpacking block_storage.network_deserialize used to do.
+def reference_unpack_words(data: bytes, bits_per_block: int) -> object:
+    stream: object = binary_stream(data)
+    blocks: object = array("H", bytes(8192))
+    blocks_per_word: int = math.floor(32 / bits_per_block)
+    words_per_chunk: int = math.ceil(4096 / blocks_per_word)
+    pos: int = 0
+    for chunk in range(0, words_per_chunk):
+        word: int = stream.read_unsigned_int_le()
+        for block in range(0, blocks_per_word):
+            if pos >= 4096:
+                break
+            blocks[pos] = (word >> (bits_per_block * block)) & ((1 << bits_per_block) - 1)
+            pos += 1
+    return blocks
+
+def get_test_blocks(bits_per_block: int) -> list:
+    max_index: int = (1 << bits_per_block) - 1
+    return [
+        array("H", bytes(8192)),
+        array("H", [max_index]) * 4096,
+        array("H", [i & max_index for i in range(0, 4096)]),
+        array("H", [random.randint(0, max_index) for i in range(0, 4096)])
+    ]
+
+def check() -> int:
+    failures: int = 0
+    for bits_per_block in bits_per_block_values:
+        for blocks in get_test_blocks(bits_per_block):
+            data: bytes = chunk_utils.pack_words(blocks, bits_per_block)
+            if data != reference_pack_words(blocks, bits_per_block):
+                print(f"{bits_per_block} bits: pack_words differs from the reference")
+                failures += 1
+            if chunk_utils.unpack_words(data, bits_per_block) != reference_unpack_words(data, bits_per_block):
+                print(f"{bits_per_block} bits: unpack_words differs from the reference")
+                failures += 1
+            if chunk_utils.unpack_words(data, bits_per_block) != blocks:
+                print(f"{bits_per_block} bits: unpack_words does not round trip")
+                failures += 1
+    for palette_size in [1, 2, 3, 5, 16, 17, 33, 64, 65, 256, 257, 4096]:
+        palette: list = list(range(1000, 1000 + palette_size))
+        storage: object = block_storage([random.randint(0, palette_size - 1) for i in range(0, 4096)], palette)
+        stream: object = binary_stream()
+        storage.network_serialize(stream)
+        result: object = block_storage([], palette)
+        result.network_deserialize(binary_stream(stream.data))
+        if result.blocks != storage.blocks or result.palette != storage.palette:
+            print(f"palette of {palette_size}: network_serialize does not round trip")
+            failures += 1
+    return failures
+
+def benchmark(name: str, function: object, count: int) -> None:
+    start: float = time.perf_counter()
+    for i in range(0, count):
+        function()
+    elapsed: float = time.perf_counter() - start
+    print(f"{name}: {elapsed * 1000000 / count:.1f} us")
+
+if __name__ == "__main__":
+    random.seed(0)
+    failures: int = check()
+    print(f"{failures} failures")
+    for bits_per_block in bits_per_block_values:
+        blocks: object = get_test_blocks(bits_per_block)[3]
+        data: bytes = chunk_utils.pack_words(blocks, bits_per_block)
+        benchmark(f"{bits_per_block} bits pack_words", lambda: chunk_utils.pack_words(blocks, bits_per_block), 200)
+        benchmark(f"{bits_per_block} bits reference pack", lambda: reference_pack_words(blocks, bits_per_block), 20)
+        benchmark(f"{bits_per_block} bits unpack_words", lambda: chunk_utils.unpack_words(data, bits_per_block), 200)
+        benchmark(f"{bits_per_block} bits reference unpack", lambda: reference_unpack_words(data, bits_per_block), 20)
+    sys.exit(1 if failures > 0 else 0)
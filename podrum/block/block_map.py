@@ -13,7 +13,11 @@
 #                                                       #
 #########################################################
 
+from array import array
+from podrum.game_data.mcbe.block_id_map import block_id_map
 from podrum.game_data.mcbe.block_states import block_states
+from podrum.world.chunk_utils import chunk_utils
+import sys
 
 class block_map:
     @staticmethod
@@ -30,6 +34,54 @@ class block_map:
             previous_state_name: str = state["name"]
             block_map.states_2[runtime_id] = (state["name"], meta)
             block_map.states_1[f"""{state["name"]} {meta}"""] = runtime_id           
+        block_map.load_legacy_tables()
+
+    # Dense tables for converting legacy worlds, legacy ids are
+    # indexed as (block_id << 4) | meta and ids or metas that are
+    # not known fall back to meta 0 and then to air.
+    @staticmethod
+    def load_legacy_tables() -> None:
+        air_runtime_id: int = block_map.get_runtime_id("minecraft:air", 0)
+        block_map.legacy_to_runtime = array("I", [air_runtime_id] * 4096)
+        for block_name, block_id in block_id_map.items():
+            if block_id > 0xff or f"{block_name} 0" not in block_map.states_1:
+                continue
+            for meta in range(0, 16):
+                runtime_id: int = block_map.states_1.get(f"{block_name} {meta}", block_map.states_1[f"{block_name} 0"])
+                block_map.legacy_to_runtime[(block_id << 4) | meta] = runtime_id
+        block_map.runtime_to_legacy = array("H", [0] * len(block_map.states_2))
+        for runtime_id, state in block_map.states_2.items():
+            block_id: int = block_id_map.get(state[0], 0)
+            if block_id <= 0xff:
+                block_map.runtime_to_legacy[runtime_id] = (block_id << 4) | (state[1] if state[1] < 16 else 0)
+    
+    # Converts the block ids and metas of a
+    # legacy section to runtime ids at once.
+    @staticmethod
+    def get_runtime_ids_from_legacy(block_ids: bytes, metas: bytes) -> object:
+        low: int = int.from_bytes(block_ids.translate(chunk_utils.shift_nibble_table), "little") | int.from_bytes(metas, "little")
+        legacy_ids: object = bytearray(len(block_ids) << 1)
+        legacy_ids[0::2] = low.to_bytes(len(block_ids), "little")
+        legacy_ids[1::2] = block_ids.translate(chunk_utils.high_nibble_table)
+        indices: object = array("H")
+        indices.frombytes(legacy_ids)
+        if sys.byteorder == "big":
+            indices.byteswap()
+        return array("I", map(block_map.legacy_to_runtime.__getitem__, indices))
+
+    # Converts the palette and indices of a block
+    # storage to legacy block ids and metas.
+    @staticmethod
+    def get_legacy_from_palette(palette: list, indices: object) -> tuple:
+        legacy_ids: list = []
+        for runtime_id in palette:
+            if runtime_id < len(block_map.runtime_to_legacy):
+                legacy_ids.append(block_map.runtime_to_legacy[runtime_id])
+            else:
+                legacy_ids.append(0)
+        palette_block_ids: bytes = bytes(legacy_id >> 4 for legacy_id in legacy_ids)
+        palette_metas: bytes = bytes(legacy_id & 0x0f for legacy_id in legacy_ids)
+        return bytes(map(palette_block_ids.__getitem__, indices)), bytes(map(palette_metas.__getitem__, indices))
     
     @staticmethod
     def get_runtime_id(block_name: str, meta: int) -> int:
@@ -22,6 +22,7 @@ from podrum.event import events
 from podrum.item.default.stone import stone as stone_item
 from podrum.item.item_manager import item_manager
 from podrum.plugin_manager import plugin_manager
+from podrum.task.task_manager import task_manager
 from podrum.world.generator_manager import generator_manager
 from podrum.world import generators
 from podrum.world.provider_manager import provider_manager
@@ -35,6 +36,7 @@ class managers:
         self.command_manager: object = command_manager()
         self.item_manager: object = item_manager()
         self.plugin_manager: object = plugin_manager(server)
+        self.task_manager: object = task_manager(server)
         self.generator_manager: object = generator_manager()
         self.provider_manager: object = provider_manager()
         self.world_manager: object = world_manager(server)
@@ -168,6 +170,7 @@ class managers:
     def register_default_providers(self) -> None:
         self.provider_manager.register_provider(providers.anvil)
         self.provider_manager.register_provider(providers.pm_anvil)
+        self.provider_manager.register_provider(providers.native)
         
     
     # [register_defaults]
@@ -0,0 +1,117 @@
+#########################################################
+#  ____           _                                     #
+# |  _ \ ___   __| |_ __ _   _ _ __ ___                 #
+# | |_) / _ \ / _` | '__| | | | '_ ` _ \                #
+# |  __/ (_) | (_| | |  | |_| | | | | | |               #
+# |_|   \___/ \__,_|_|   \__,_|_| |_| |_|               #
+#                                                       #
+# Copyright 2021 Podrum Team.                           #
+#                                                       #
+# This file is licensed under the GPL v2.0 license.     #
+# The license file is located in the root directory     #
+# of the source code. If not you may not use this file. #
+#                                                       #
+#########################################################
+
+import asyncio
+from podrum.protocol.mcbe.rak_net_interface import rak_net_interface
+from rak_net.constant.protocol_info import protocol_info
+from rak_net.handler.offline_ping_handler import offline_ping_handler
+from rak_net.handler.open_connection_request_1_handler import open_connection_request_1_handler
+from rak_net.handler.open_connection_request_2_handler import open_connection_request_2_handler
+from rak_net.server import server as rak_net_server
+from rak_net.utils.internet_address import internet_address
+import threading
+
+class async_rak_net_server(rak_net_server):
+    def __init__(self, hostname: str, port: int, ipv: int = 4) -> None:
+        super().__init__(hostname, port, ipv)
+        self.transport: object = None
+        self.loop: object = None
+        self.loop_thread_id: int = 0
+        self.writing_paused: bool = False
+
+    # Transports are not thread safe, sends from
+    # other threads are handed to the event loop.
+    def send_data(self, data: bytes, address: object) -> None:
+        if self.transport is None:
+            return
+        if threading.get_ident() == self.loop_thread_id:
+            self.transport.sendto(data, (address.hostname, address.port))
+        else:
+            self.loop.call_soon_threadsafe(self.transport.sendto, data, (address.hostname, address.port))
+
+    def handle_datagram(self, data: bytes, hostname: str, port: int) -> None:
+        address: object = internet_address(hostname, port)
+        if address.token in self.connections:
+            self.get_connection(address).handle(data)
+        elif data[0] == protocol_info.offline_ping:
+            self.send_data(offline_ping_handler.handle(data, address, self), address)
+        elif data[0] == protocol_info.open_connection_request_1:
+            self.send_data(open_connection_request_1_handler.handle(data, address, self), address)
+        elif data[0] == protocol_info.open_connection_request_2:
+            self.send_data(open_connection_request_2_handler.handle(data, address, self), address)
+
+    # Sends the queued acks and frames of every connection,
+    # nothing is sent while the transport's buffer is full.
+    def update(self) -> None:
+        if not self.writing_paused:
+            for connection in dict(self.connections).values():
+                connection.update()
+
+class datagram_protocol(asyncio.DatagramProtocol):
+    def __init__(self, rak_net_server: object) -> None:
+        self.rak_net_server: object = rak_net_server
+
+    def connection_made(self, transport: object) -> None:
+        self.rak_net_server.transport = transport
+
+    def datagram_received(self, data: bytes, address: tuple) -> None:
+        if len(data) > 0:
+            self.rak_net_server.handle_datagram(data, address[0], address[1])
+
+    def error_received(self, error: Exception) -> None:
+        pass
+
+    def pause_writing(self) -> None:
+        self.rak_net_server.writing_paused = True
+
+    def resume_writing(self) -> None:
+        self.rak_net_server.writing_paused = False
+
+class async_rak_net_interface(rak_net_interface):
+    rak_net_server_class: object = async_rak_net_server
+
+    # [on_tick]
+    # :return: = None
+    # Flushes the outgoing packets once per tick.
+    def on_tick(self, current_tick: int) -> None:
+        self.rak_net_server.loop.call_soon_threadsafe(self.rak_net_server.update)
+
+    # [stop_interface]
+    # :return: = None
+    # Stops the interface
+    def stop_interface(self) -> None:
+        self.stopped: bool = True
+        self.server.tick_loop.remove_callback(self.on_tick)
+        if self.rak_net_server.loop is not None:
+            self.rak_net_server.loop.call_soon_threadsafe(self.rak_net_server.loop.stop)
+
+    # [run]
+    # :return: = None
+    # Receives datagrams on an event loop instead
+    # of polling the socket.
+    def run(self) -> None:
+        loop: object = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self.rak_net_server.loop = loop
+        self.rak_net_server.loop_thread_id = threading.get_ident()
+        transport, protocol = loop.run_until_complete(loop.create_datagram_endpoint(
+            lambda: datagram_protocol(self.rak_net_server),
+            sock = self.rak_net_server.socket.socket
+        ))
+        self.server.tick_loop.add_callback(self.on_tick)
+        if not self.stopped:
+            loop.run_forever()
+        transport.close()
+        loop.close()
@@ -32,7 +32,6 @@ from podrum.protocol.mcbe.packet.command_request_packet import command_request_p
 from podrum.protocol.mcbe.packet.game_packet import game_packet
 from podrum.protocol.mcbe.packet.creative_content_packet import creative_content_packet
 from podrum.protocol.mcbe.packet.item_component_packet import item_component_packet
-from podrum.protocol.mcbe.packet.level_chunk_packet import level_chunk_packet
 from podrum.protocol.mcbe.packet.login_packet import login_packet
 from podrum.protocol.mcbe.packet.move_player_packet import move_player_packet
 from podrum.protocol.mcbe.packet.player_action_packet import player_action_packet
@@ -52,14 +51,24 @@ from podrum.protocol.mcbe.type.login_status_type import login_status_type
 from podrum.protocol.mcbe.type.resource_pack_client_response_type import resource_pack_client_response_type
 from podrum.protocol.mcbe.type.text_type import text_type
 from podrum.protocol.mcbe.type.action_type import action_type
-from podrum.task.immediate_task import immediate_task
 from podrum.world.chunk.chunk import chunk
 from rak_net.protocol.frame import frame
+from threading import RLock
+import time
 import zlib
 
 class mcbe_player:
+    send_buffer_limit: int = 1024 * 64
+
     def __init__(self, connection: object, server: object, entity_id: int) -> None:
         self.connection: object = connection
+        self.send_buffer: list = []
+        self.send_buffer_size: int = 0
+        self.send_lock: object = RLock()
+        self.sent_chunks: set = set()
+        self.chunk_queue: dict = {}
+        self.failed_chunks: dict = {}
+        self.chunk_center: tuple = None
         self.server: object = server
         self.entity_id: int = entity_id
         self.world: object = server.world
@@ -246,8 +255,6 @@ class mcbe_player:
     def handle_move_player_packet(self, data):
         packet: object = move_player_packet(data)
         packet.decode()
-        if math.floor(packet.position.x / (8 * 16)) != math.floor(self.position.x / (8 * 16)) or math.floor(packet.position.z / (8 * 16)) != math.floor(self.position.z / (8 * 16)):
-            self.send_chunks()
         old_position: object = self.position
         self.position: object = packet.position
         move_event: object = player_move_event(self, self.position)
@@ -255,6 +262,9 @@ class mcbe_player:
         if move_event.canceled:
             self.position: object = old_position
             # Todo
+        self.world.set_player_position(self.identity, self.position)
+        if self.chunk_center is not None and self.chunk_center != (math.floor(self.position.x) >> 4, math.floor(self.position.z) >> 4):
+            self.update_chunks()
 
     def handle_player_action_packet(self, data): # probably not cancelable
         packet: object = player_action_packet(data)
@@ -284,9 +294,7 @@ class mcbe_player:
         self.send_packet(new_packet.data)
         
     def broadcast_message(self, message: str, xuid: str = "", needs_translation: bool = False) -> None:
-        self.server.send_message(message)
-        for p in self.server.players.values():
-            p.send_message(message, xuid, needs_translation)
+        self.server.broadcast_message(message, xuid, needs_translation)
 
 
     def send_chat_message(self, message: str) -> None:
@@ -302,8 +310,7 @@ class mcbe_player:
         packet: object = command_request_packet(data)
         packet.decode()
         if packet.origin == command_origin_type.player:
-            command_task: object = immediate_task(self.server.dispatch_command, [packet.command[1:], self])
-            command_task.start()
+            self.server.managers.task_manager.run_task(self.server.dispatch_command, [packet.command[1:], self])
 
     def handle_packet(self, data: bytes) -> None:
         if data[0] == mcbe_protocol_info.login_packet:
@@ -324,8 +331,62 @@ class mcbe_player:
             self.handle_command_request_packet(data)
 
     def send_chunks(self) -> None:
-        chunk_task: object = immediate_task(self.world.send_radius, [self.position.x, self.position.z, self.view_distance, self])
-        chunk_task.start()
+        self.update_chunks()
+
+    # Works out which chunks the player needs around its
+    # current chunk, chunks it already has are not sent again.
+    def update_chunks(self) -> None:
+        self.chunk_center: tuple = (math.floor(self.position.x) >> 4, math.floor(self.position.z) >> 4)
+        distances: dict = {}
+        for chunk_x, chunk_z, distance in self.world.get_radius_chunks(self.position.x, self.position.z, self.view_distance):
+            distances[(chunk_x, chunk_z)] = distance
+        self.sent_chunks.intersection_update(distances)
+        self.failed_chunks: dict = {key: retry_time for key, retry_time in self.failed_chunks.items() if key in distances}
+        chunk_queue: dict = {}
+        for key, distance in distances.items():
+            if key in self.chunk_queue:
+                chunk_queue[key] = self.chunk_queue[key]
+            elif key not in self.sent_chunks and key not in self.failed_chunks:
+                chunk_queue[key] = self.world.request_chunk(key[0], key[1], distance)
+        self.chunk_queue: dict = chunk_queue
+        self.send_network_chunk_publisher_update()
+
+    # Sends the queued chunks that finished loading,
+    # at most chunks_per_tick of them, nearest first.
+    # Chunks that are not encoded yet are queued again
+    # until the task pool encodes them and chunks that
+    # failed to load are requested again a second later.
+    def send_queued_chunks(self) -> None:
+        now: float = time.monotonic()
+        for key, retry_time in list(self.failed_chunks.items()):
+            if now >= retry_time:
+                del self.failed_chunks[key]
+                distance: int = ((key[0] - self.chunk_center[0]) ** 2) + ((key[1] - self.chunk_center[1]) ** 2)
+                self.chunk_queue[key] = self.world.request_chunk(key[0], key[1], distance)
+        sent_count: int = 0
+        for key, future in list(self.chunk_queue.items()):
+            if sent_count >= self.server.config.data["chunks_per_tick"]:
+                break
+            if future.done():
+                del self.chunk_queue[key]
+                if future.exception() is None:
+                    result: object = future.result()
+                    if not isinstance(result, bytes):
+                        future: object = self.world.request_chunk_payload(result)
+                        if not future.done():
+                            self.chunk_queue[key] = future
+                            continue
+                        result: bytes = future.result()
+                    self.send_game_packet(result)
+                    self.sent_chunks.add(key)
+                    sent_count += 1
+                else:
+                    self.failed_chunks[key] = now + 1
+                    self.server.logger.error(f"Failed to load chunk {key[0]} {key[1]}: {future.exception()!r}")
+
+    def tick(self) -> None:
+        self.send_queued_chunks()
+        self.flush_packets()
         
     def send_available_commands(self) -> None:
         new_packet: object = available_commands_packet()
@@ -359,12 +420,7 @@ class mcbe_player:
         self.send_packet(new_packet.data)
     
     def send_chunk(self, send_chunk: object) -> None:
-        packet: object = level_chunk_packet()
-        packet.chunk_x = send_chunk.x
-        packet.chunk_z = send_chunk.z
-        packet.chunk_data = send_chunk.network_serialize()
-        packet.encode()
-        self.send_packet(packet.data)
+        self.send_game_packet(self.world.get_chunk_payload(send_chunk))
 
     def send_play_status(self, status: int) -> None:
         packet: object = play_status_packet()
@@ -388,11 +444,35 @@ class mcbe_player:
         packet.encode()
         self.send_packet(packet.data)
     
+    # Packets are buffered and sent together in one game
+    # packet when the buffer is flushed, once per tick.
     def send_packet(self, data: bytes) -> None:
-        new_packet: object = game_packet()
-        new_packet.write_packet_data(data)
-        new_packet.encode()
+        with self.send_lock:
+            self.send_buffer.append(data)
+            self.send_buffer_size += len(data)
+            if self.send_buffer_size >= self.send_buffer_limit:
+                self.flush_packets()
+
+    def flush_packets(self) -> None:
+        with self.send_lock:
+            if len(self.send_buffer) > 0:
+                new_packet: object = game_packet()
+                for data in self.send_buffer:
+                    new_packet.write_packet_data(data)
+                self.send_buffer: list = []
+                self.send_buffer_size: int = 0
+                new_packet.encode()
+                self.send_encoded_game_packet(new_packet.data)
+
+    # Sends an already encoded game packet, the buffered
+    # packets are flushed first to keep them in order.
+    def send_game_packet(self, data: bytes) -> None:
+        with self.send_lock:
+            self.flush_packets()
+            self.send_encoded_game_packet(data)
+
+    def send_encoded_game_packet(self, data: bytes) -> None:
         send_packet: object = frame()
         send_packet.reliability = 0
-        send_packet.body = new_packet.data
+        send_packet.body = data
         self.connection.add_to_queue(send_packet, False)
\ No newline at end of file
@@ -22,10 +22,12 @@ from rak_net.server import server as rak_net_server
 from threading import Thread
 
 class rak_net_interface(Thread):
+    rak_net_server_class: object = rak_net_server
+
     def __init__(self, server: object) -> None:
         super().__init__()
         self.server: object = server
-        self.rak_net_server: object = rak_net_server(server.config.data["ip_address"]["hostname"], server.config.data["ip_address"]["port"])
+        self.rak_net_server: object = self.rak_net_server_class(server.config.data["ip_address"]["hostname"], server.config.data["ip_address"]["port"])
         self.rak_net_server.interface = self
         self.set_status(server.config.data["motd"], 0, server.config.data["max_players"])
 
@@ -77,9 +79,15 @@ class rak_net_interface(Thread):
 
     # [on_frame]
     # :return: = None
+    # Passes the frame to the tick thread.
+    def on_frame(self, packet: object, connection: object) -> None:
+        self.server.tick_loop.call_soon(self.handle_frame, [packet, connection])
+
+    # [handle_frame]
+    # :return: = None
     # Handles the game packets and passes
     # them decoded to the player's handler.
-    def on_frame(self, packet: object, connection: object) -> None:
+    def handle_frame(self, packet: object, connection: object) -> None:
         if connection.address.token in self.server.players:
             if packet.body[0] == 0xfe:
                 new_packet: object = game_packet(packet.body)
@@ -90,9 +98,15 @@ class rak_net_interface(Thread):
             
     # [on_new_incoming_connection]
     # :return: = None
+    # Passes the new connection to the tick thread.
+    def on_new_incoming_connection(self, connection: object) -> None:
+        self.server.tick_loop.call_soon(self.handle_new_incoming_connection, [connection])
+
+    # [handle_new_incoming_connection]
+    # :return: = None
     # Adds the player when he logs in
     # and sets the default values to him.
-    def on_new_incoming_connection(self, connection: object) -> None:
+    def handle_new_incoming_connection(self, connection: object) -> None:
         self.server.players[connection.address.token] = mcbe_player(connection, self.server, self.server.current_entity_id)
         max_float: float = 3.4028234663852886e+38
         self.server.players[connection.address.token].attributes = [
@@ -128,10 +142,19 @@ class rak_net_interface(Thread):
 
     # [on_disconnect]
     # :return: = None
-    # Handles when a player disconnects.   
+    # Passes the disconnect to the tick thread.
     def on_disconnect(self, connection: object) -> None:
+        self.server.tick_loop.call_soon(self.handle_disconnect, [connection])
+
+    # [handle_disconnect]
+    # :return: = None
+    # Handles when a player disconnects.   
+    def handle_disconnect(self, connection: object) -> None:
         quit_event: object = player_quit_event(self.server.players[connection.address.token])
         quit_event.call()
+        player: object = self.server.players[connection.address.token]
+        if hasattr(player, "identity"):
+            self.server.managers.task_manager.run_task(player.world.unload_player, [player.identity])
         del self.server.players[connection.address.token]
         self.set_count(len(self.server.players))
         self.server.logger.info(f"{connection.address.token} disconnected.")
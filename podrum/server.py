@@ -19,8 +19,13 @@ from podrum.block.block_map import block_map
 from podrum.config import config
 from podrum.console.logger import logger
 from podrum.managers import managers
+from podrum.protocol.mcbe.async_rak_net_interface import async_rak_net_interface
+from podrum.protocol.mcbe.packet.game_packet import game_packet
+from podrum.protocol.mcbe.packet.text_packet import text_packet
+from podrum.protocol.mcbe.type.text_type import text_type
 from podrum.protocol.mcbe.rak_net_interface import rak_net_interface
 from podrum.task.repeating_task import repeating_task
+from podrum.task.tick_loop import tick_loop
 import sys
 import time
 
@@ -28,8 +33,13 @@ class server:
     def __init__(self) -> None:
         self.setup_config()
         block_map.load_map()
+        self.tick_loop: object = tick_loop(self)
+        self.tick_loop.add_callback(self.tick_players)
         self.managers: object = managers(self)
-        self.rak_net_interface: object = rak_net_interface(self)
+        if self.config.data["asyncio_network"]:
+            self.rak_net_interface: object = async_rak_net_interface(self)
+        else:
+            self.rak_net_interface: object = rak_net_interface(self)
         self.logger: object = logger()
         self.players: dict = {}
         self.current_entity_id: int = 1
@@ -62,6 +72,24 @@ class server:
             self.config.data["world_provider"] = "anvil"
         if "world_name" not in self.config.data:
             self.config.data["world_name"] = "world"
+        if "chunk_cache_size" not in self.config.data:
+            self.config.data["chunk_cache_size"] = 64
+        if "chunk_loader_workers" not in self.config.data:
+            self.config.data["chunk_loader_workers"] = 4
+        if "generator_processes" not in self.config.data:
+            self.config.data["generator_processes"] = 0
+        if "autosave_interval" not in self.config.data:
+            self.config.data["autosave_interval"] = 300
+        if "task_workers" not in self.config.data:
+            self.config.data["task_workers"] = 8
+        if "asyncio_network" not in self.config.data:
+            self.config.data["asyncio_network"] = False
+        if "chunks_per_tick" not in self.config.data:
+            self.config.data["chunks_per_tick"] = 8
+        if "chunk_unload_delay" not in self.config.data:
+            self.config.data["chunk_unload_delay"] = 30
+        if "max_loaded_chunks" not in self.config.data:
+            self.config.data["max_loaded_chunks"] = 2048
         self.config.save()      
 
     def start(self) -> None:
@@ -79,12 +107,12 @@ class server:
         self.rak_net_interface.start_interface()
         self.console_input_task: object = repeating_task(self.console_input)
         self.console_input_task.start()
+        if self.config.data["autosave_interval"] > 0:
+            self.autosave_task: object = self.managers.task_manager.run_repeating_task(self.managers.world_manager.save_all, [], self.config.data["autosave_interval"], self.config.data["autosave_interval"])
         finish_time: float = time.time()
         startup_time: float = "%.3f" % (finish_time - start_time)
         self.logger.success(f"Done in {startup_time}. Type help to view all available commands.")
-        while self.is_ticking:
-            # Add some sort of ticking?
-            time.sleep(0.0001)
+        self.tick_loop.run()
             
     def dispatch_command(self, user_input: str, sender: object) -> None:
         if len(user_input) > 0:
@@ -104,20 +132,51 @@ class server:
 
     def stop(self) -> None:
         self.console_input_task.stop()
+        if hasattr(self, "autosave_task"):
+            self.autosave_task.cancel()
         self.rak_net_interface.stop_interface()
         self.managers.plugin_manager.unload_all()
         self.managers.world_manager.unload_all()
+        self.managers.task_manager.stop()
         self.logger.success("Server stopped.")
         self.is_ticking = False
+        self.tick_loop.stop()
         os.kill(os.getpid(), 15)
 
+    def tick_players(self, current_tick: int) -> None:
+        for player in list(self.players.values()):
+            try:
+                player.tick()
+            except Exception as error:
+                player_name: str = player.username if hasattr(player, "username") else f"entity {player.entity_id}"
+                self.logger.error(f"Error ticking {player_name}: {error!r}")
+
     def send_message(self, message: str) -> None:
         self.logger.info(message)
         
-    def broadcast_message(self, message: str) -> None:
+    # Encodes and compresses a packet once and sends
+    # it to every player or only to the recipients.
+    def broadcast_packet(self, packet: object, recipients: list = None) -> None:
+        if recipients is None:
+            recipients: list = list(self.players.values())
+        if len(recipients) == 0:
+            return
+        packet.encode()
+        new_packet: object = game_packet()
+        new_packet.write_packet_data(packet.data)
+        new_packet.encode()
+        for player in recipients:
+            player.send_game_packet(new_packet.data)
+        
+    def broadcast_message(self, message: str, xuid: str = "", needs_translation: bool = False) -> None:
         self.send_message(message)
-        for player in self.players.values():
-            player.send_message(message)
+        packet: object = text_packet()
+        packet.type = text_type.raw
+        packet.needs_translation = needs_translation
+        packet.message = message
+        packet.xuid = xuid
+        packet.platform_chat_id = ""
+        self.broadcast_packet(packet)
             
     def send_chat_message(self, message: str) -> None:
         self.broadcast_message(f"[Server] {message}")
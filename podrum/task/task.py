@@ -0,0 +1,68 @@
+#########################################################
+#  ____           _                                     #
+# |  _ \ ___   __| |_ __ _   _ _ __ ___                 #
+# | |_) / _ \ / _` | '__| | | | '_ ` _ \                #
+# |  __/ (_) | (_| | |  | |_| | | | | | |               #
+# |_|   \___/ \__,_|_|   \__,_|_| |_| |_|               #
+#                                                       #
+# Copyright 2021 Podrum Team.                           #
+#                                                       #
+# This file is licensed under the GPL v2.0 license.     #
+# The license file is located in the root directory     #
+# of the source code. If not you may not use this file. #
+#                                                       #
+#########################################################
+
+import time
+
+class task:
+    def __init__(self, function: object, args: list = [], interval: float = 0, is_tick_task: bool = False) -> None:
+        self.function: object = function
+        self.args: list = args
+        self.interval: float = interval
+        self.is_tick_task: bool = is_tick_task
+        self.next_run: float = 0
+        self.future: object = None
+        self.is_cancelled: bool = False
+        self.is_running: bool = False
+        self.run_count: int = 0
+        self.total_time: float = 0
+        self.last_time: float = 0
+
+    # [cancel]
+    # :return: = None
+    # Stops the task from running again.
+    def cancel(self) -> None:
+        self.is_cancelled: bool = True
+        if self.future is not None:
+            self.future.cancel()
+
+    # [wait]
+    # :return: = object
+    # Waits for the last run of the task
+    # to finish and returns its result.
+    def wait(self, timeout: float = None) -> object:
+        if self.future is not None:
+            return self.future.result(timeout)
+
+    # [get_average_time]
+    # :return: = float
+    # Gets how long a run of the task takes on average.
+    def get_average_time(self) -> float:
+        if self.run_count == 0:
+            return 0
+        return self.total_time / self.run_count
+
+    # [run]
+    # :return: = object
+    # Runs the task once and records how long it took.
+    def run(self) -> object:
+        self.is_running: bool = True
+        start_time: float = time.perf_counter()
+        try:
+            return self.function(*self.args)
+        finally:
+            self.last_time: float = time.perf_counter() - start_time
+            self.total_time += self.last_time
+            self.run_count += 1
+            self.is_running: bool = False
@@ -0,0 +1,138 @@
+#########################################################
+#  ____           _                                     #
+# |  _ \ ___   __| |_ __ _   _ _ __ ___                 #
+# | |_) / _ \ / _` | '__| | | | '_ ` _ \                #
+# |  __/ (_) | (_| | |  | |_| | | | | | |               #
+# |_|   \___/ \__,_|_|   \__,_|_| |_| |_|               #
+#                                                       #
+# Copyright 2021 Podrum Team.                           #
+#                                                       #
+# This file is licensed under the GPL v2.0 license.     #
+# The license file is located in the root directory     #
+# of the source code. If not you may not use this file. #
+#                                                       #
+#########################################################
+
+from concurrent.futures import ThreadPoolExecutor
+import heapq
+import itertools
+from podrum.task.task import task
+from threading import Lock
+import time
+
+class task_manager:
+    def __init__(self, server: object) -> None:
+        self.server: object = server
+        self.pool: object = ThreadPoolExecutor(max_workers = server.config.data["task_workers"])
+        self.timed_tasks: list = []
+        self.tick_tasks: list = []
+        self.lock: object = Lock()
+        self.counter: object = itertools.count()
+        server.tick_loop.add_callback(self.tick)
+
+    # [submit]
+    # :return: = None
+    # Runs a task on the thread pool and logs its errors.
+    def submit(self, task_obj: object) -> None:
+        task_obj.future = self.pool.submit(task_obj.run)
+        task_obj.future.add_done_callback(self.log_error)
+
+    # [log_error]
+    # :return: = None
+    # Logs the error of a finished task.
+    def log_error(self, future: object) -> None:
+        if not future.cancelled() and future.exception() is not None:
+            self.server.logger.error(f"Error in task: {future.exception()!r}")
+
+    # [run_task]
+    # :return: = task
+    # Runs a function on the thread pool right away.
+    def run_task(self, function: object, args: list = []) -> object:
+        task_obj: object = task(function, args)
+        self.submit(task_obj)
+        return task_obj
+
+    # [run_delayed_task]
+    # :return: = task
+    # Runs a function on the thread pool
+    # after a delay in seconds.
+    def run_delayed_task(self, function: object, args: list = [], delay: float = 0) -> object:
+        task_obj: object = task(function, args)
+        self.schedule(task_obj, time.perf_counter() + delay)
+        return task_obj
+
+    # [run_repeating_task]
+    # :return: = task
+    # Runs a function on the thread pool every interval seconds,
+    # a run is skipped if the previous one has not finished.
+    def run_repeating_task(self, function: object, args: list = [], interval: float = 1, delay: float = 0) -> object:
+        task_obj: object = task(function, args, interval)
+        self.schedule(task_obj, time.perf_counter() + delay)
+        return task_obj
+
+    # [run_tick_task]
+    # :return: = task
+    # Runs a function on the tick thread after delay ticks,
+    # and then every interval ticks if interval is set.
+    def run_tick_task(self, function: object, args: list = [], delay: int = 0, interval: int = 0) -> object:
+        task_obj: object = task(function, args, interval, True)
+        self.schedule(task_obj, self.server.tick_loop.current_tick + delay)
+        return task_obj
+
+    # [schedule]
+    # :return: = None
+    # Queues a task to be started once next_run is reached.
+    def schedule(self, task_obj: object, next_run: float) -> None:
+        task_obj.next_run: float = next_run
+        with self.lock:
+            if task_obj.is_tick_task:
+                heapq.heappush(self.tick_tasks, (next_run, next(self.counter), task_obj))
+            else:
+                heapq.heappush(self.timed_tasks, (next_run, next(self.counter), task_obj))
+
+    # [get_tasks]
+    # :return: = list
+    # Gets the tasks that are waiting to run.
+    def get_tasks(self) -> list:
+        with self.lock:
+            return [entry[2] for entry in self.timed_tasks + self.tick_tasks if not entry[2].is_cancelled]
+
+    # [tick]
+    # :return: = None
+    # Starts the tasks that are due, this is
+    # called by the tick loop every tick.
+    def tick(self, current_tick: int) -> None:
+        now: float = time.perf_counter()
+        due_tasks: list = []
+        with self.lock:
+            while len(self.timed_tasks) > 0 and self.timed_tasks[0][0] <= now:
+                due_tasks.append(heapq.heappop(self.timed_tasks)[2])
+            while len(self.tick_tasks) > 0 and self.tick_tasks[0][0] <= current_tick:
+                due_tasks.append(heapq.heappop(self.tick_tasks)[2])
+        for task_obj in due_tasks:
+            if task_obj.is_cancelled:
+                continue
+            if task_obj.is_tick_task:
+                try:
+                    task_obj.run()
+                except Exception as error:
+                    self.server.logger.error(f"Error in tick task: {error!r}")
+            elif task_obj.future is None or task_obj.future.done():
+                self.submit(task_obj)
+            if task_obj.interval > 0 and not task_obj.is_cancelled:
+                if task_obj.is_tick_task:
+                    self.schedule(task_obj, current_tick + task_obj.interval)
+                else:
+                    self.schedule(task_obj, max(task_obj.next_run + task_obj.interval, now))
+
+    # [stop]
+    # :return: = None
+    # Cancels every scheduled task and stops the thread
+    # pool without waiting for running tasks.
+    def stop(self) -> None:
+        with self.lock:
+            for entry in self.timed_tasks + self.tick_tasks:
+                entry[2].cancel()
+            self.timed_tasks.clear()
+            self.tick_tasks.clear()
+        self.pool.shutdown(False)
@@ -0,0 +1,114 @@
+#########################################################
+#  ____           _                                     #
+# |  _ \ ___   __| |_ __ _   _ _ __ ___                 #
+# | |_) / _ \ / _` | '__| | | | '_ ` _ \                #
+# |  __/ (_) | (_| | |  | |_| | | | | | |               #
+# |_|   \___/ \__,_|_|   \__,_|_| |_| |_|               #
+#                                                       #
+# Copyright 2021 Podrum Team.                           #
+#                                                       #
+# This file is licensed under the GPL v2.0 license.     #
+# The license file is located in the root directory     #
+# of the source code. If not you may not use this file. #
+#                                                       #
+#########################################################
+
+from collections import deque
+from queue import Empty
+from queue import SimpleQueue
+import time
+
+class tick_loop:
+    def __init__(self, server: object, tps: int = 20, max_catch_up_ticks: int = 5) -> None:
+        self.server: object = server
+        self.tps: int = tps
+        self.tick_interval: float = 1 / tps
+        self.max_catch_up_ticks: int = max_catch_up_ticks
+        self.callbacks: list = []
+        self.calls: object = SimpleQueue()
+        self.current_tick: int = 0
+        self.tick_duration: float = 0
+        self.tick_times: object = deque(maxlen = tps + 1)
+        self.is_running: bool = False
+
+    # [add_callback]
+    # :return: = None
+    # Adds a function that is called every
+    # tick with the current tick number.
+    def add_callback(self, callback: object) -> None:
+        self.callbacks.append(callback)
+
+    # [remove_callback]
+    # :return: = None
+    # Removes a tick callback.
+    def remove_callback(self, callback: object) -> None:
+        if callback in self.callbacks:
+            self.callbacks.remove(callback)
+
+    # [call_soon]
+    # :return: = None
+    # Queues a function to run on the tick thread,
+    # other threads use this to hand over work.
+    def call_soon(self, function: object, args: list = []) -> None:
+        self.calls.put((function, args))
+
+    # [get_tps]
+    # :return: = float
+    # Gets the ticks per second measured
+    # over the last second.
+    def get_tps(self) -> float:
+        if len(self.tick_times) < 2:
+            return float(self.tps)
+        return min((len(self.tick_times) - 1) / (self.tick_times[-1] - self.tick_times[0]), float(self.tps))
+
+    # [get_tick_usage]
+    # :return: = float
+    # Gets how much of the tick interval the
+    # last tick used, as a percentage.
+    def get_tick_usage(self) -> float:
+        return (self.tick_duration / self.tick_interval) * 100
+
+    # [tick]
+    # :return: = None
+    # Runs the queued calls and the tick callbacks.
+    def tick(self) -> None:
+        while True:
+            try:
+                function, args = self.calls.get_nowait()
+            except Empty:
+                break
+            try:
+                function(*args)
+            except Exception as error:
+                self.server.logger.error(f"Error in queued call: {error!r}")
+        for callback in list(self.callbacks):
+            try:
+                callback(self.current_tick)
+            except Exception as error:
+                self.server.logger.error(f"Error in tick callback: {error!r}")
+        self.current_tick += 1
+
+    # [run]
+    # :return: = None
+    # Ticks at a fixed rate until stopped. Late ticks are
+    # caught up, but only max_catch_up_ticks of them.
+    def run(self) -> None:
+        self.is_running: bool = True
+        next_tick: float = time.perf_counter()
+        while self.is_running:
+            now: float = time.perf_counter()
+            if now < next_tick:
+                time.sleep(next_tick - now)
+                continue
+            self.tick_times.append(now)
+            self.tick()
+            self.tick_duration: float = time.perf_counter() - now
+            next_tick += self.tick_interval
+            if time.perf_counter() - next_tick > self.tick_interval * self.max_catch_up_ticks:
+                next_tick: float = time.perf_counter()
+
+    # [stop]
+    # :return: = None
+    # Stops the loop after the current tick.
+    def stop(self) -> None:
+        self.is_running: bool = False
@@ -13,19 +13,32 @@
 #                                                       #
 #########################################################
 
+from array import array
+from binary_utils.binary_converter import binary_converter
 import math
 from podrum.block.default.air import air
+from podrum.world.chunk_utils import chunk_utils
+import sys
 
 class block_storage:
+    air_runtime_id: int = -1
+
     def __init__(self, blocks: list = [], palette: list = []) -> None:
         if len(palette) > 0:
-            self.palette: list = palette
+            self.palette: list = list(palette)
         else:
-            self.palette: list = [air().runtime_id]
+            self.palette: list = [block_storage.get_air_runtime_id()]
+        self.rebuild_palette_lookup()
         if len(blocks) == 4096:
-            self.blocks: list = blocks
+            self.blocks: object = array("H", blocks)
         else:
-            self.blocks: list = [0] * 4096
+            self.blocks: object = array("H", bytes(8192))
+
+    @staticmethod
+    def get_air_runtime_id() -> int:
+        if block_storage.air_runtime_id == -1:
+            block_storage.air_runtime_id: int = air().runtime_id
+        return block_storage.air_runtime_id
            
     @staticmethod
     def get_index(x: int, y: int, z: int) -> int:
@@ -36,44 +49,177 @@ class block_storage:
         assert x >= 0 and x < 16, f"x ({x}) is not between 0 and 15"
         assert y >= 0 and y < 16, f"y ({y}) is not between 0 and 15"
         assert z >= 0 and z < 16, f"z ({z}) is not between 0 and 15"
+
+    def rebuild_palette_lookup(self) -> None:
+        self.palette_lookup: dict = {}
+        for palette_index, runtime_id in enumerate(self.palette):
+            if runtime_id not in self.palette_lookup:
+                self.palette_lookup[runtime_id] = palette_index
+
+    def get_palette_index(self, runtime_id: int) -> int:
+        palette_index: int = self.palette_lookup.get(runtime_id, -1)
+        if palette_index == -1:
+            palette_index: int = len(self.palette)
+            self.palette.append(runtime_id)
+            self.palette_lookup[runtime_id] = palette_index
+        return palette_index
     
     def get_block_runtime_id(self, x, y, z) -> int:
         block_storage.check_bounds(x, y, z)
-        palette_index: int = self.blocks[block_storage.get_index(x, y, z)]
-        return self.palette[palette_index]
+        return self.palette[self.blocks[block_storage.get_index(x, y, z)]]
     
     def set_block_runtime_id(self, x, y, z, runtime_id: int) -> None:
         block_storage.check_bounds(x, y, z)
-        if runtime_id not in self.palette:
-            self.palette.append(runtime_id)
-        self.blocks[block_storage.get_index(x, y, z)] = self.palette.index(runtime_id)
+        self.blocks[block_storage.get_index(x, y, z)] = self.get_palette_index(runtime_id)
+
+    def fill(self, runtime_id: int) -> None:
+        self.palette: list = [runtime_id]
+        self.palette_lookup: dict = {runtime_id: 0}
+        self.blocks: object = array("H", bytes(8192))
+
+    def fill_column(self, x: int, z: int, y_from: int, y_to: int, runtime_id: int) -> None:
+        block_storage.check_bounds(x, 0, z)
+        y_from: int = max(y_from, 0)
+        y_to: int = min(y_to, 16)
+        if y_to > y_from:
+            start: int = block_storage.get_index(x, y_from, z)
+            self.blocks[start:start + (y_to - y_from)] = array("H", [self.get_palette_index(runtime_id)]) * (y_to - y_from)
+
+    def fill_layer(self, y: int, runtime_id: int) -> None:
+        block_storage.check_bounds(0, y, 0)
+        self.blocks[y::16] = array("H", [self.get_palette_index(runtime_id)]) * 256
+
+    @staticmethod
+    def get_box_slices(x_from: int, y_from: int, z_from: int, x_to: int, y_to: int, z_to: int) -> list:
+        if y_from == 0 and y_to == 16:
+            if z_from == 0 and z_to == 16:
+                return [(x_from << 8, x_to << 8)]
+            return [((x << 8) + (z_from << 4), (x << 8) + (z_to << 4)) for x in range(x_from, x_to)]
+        slices: list = []
+        for x in range(x_from, x_to):
+            for z in range(z_from, z_to):
+                start: int = block_storage.get_index(x, y_from, z)
+                slices.append((start, start + (y_to - y_from)))
+        return slices
+
+    def fill_box(self, x_from: int, y_from: int, z_from: int, x_to: int, y_to: int, z_to: int, runtime_id: int) -> None:
+        block_storage.check_bounds(x_from, y_from, z_from)
+        block_storage.check_bounds(x_to - 1, y_to - 1, z_to - 1)
+        if x_from == 0 and y_from == 0 and z_from == 0 and x_to == 16 and y_to == 16 and z_to == 16:
+            self.fill(runtime_id)
+        else:
+            palette_index: array = array("H", [self.get_palette_index(runtime_id)])
+            for start, end in block_storage.get_box_slices(x_from, y_from, z_from, x_to, y_to, z_to):
+                self.blocks[start:end] = palette_index * (end - start)
+
+    def replace_box(self, x_from: int, y_from: int, z_from: int, x_to: int, y_to: int, z_to: int, runtime_ids: set, runtime_id: int) -> None:
+        block_storage.check_bounds(x_from, y_from, z_from)
+        block_storage.check_bounds(x_to - 1, y_to - 1, z_to - 1)
+        if x_from == 0 and y_from == 0 and z_from == 0 and x_to == 16 and y_to == 16 and z_to == 16:
+            palette: list = [runtime_id if palette_runtime_id in runtime_ids else palette_runtime_id for palette_runtime_id in self.palette]
+            self.palette: list = list(dict.fromkeys(palette))
+            self.rebuild_palette_lookup()
+            if len(self.palette) != len(palette):
+                mapping: object = array("H", map(self.palette_lookup.__getitem__, palette))
+                self.blocks: object = array("H", map(mapping.__getitem__, self.blocks))
+        else:
+            replaced_indices: list = [palette_index for palette_index, palette_runtime_id in enumerate(self.palette) if palette_runtime_id in runtime_ids]
+            if len(replaced_indices) > 0:
+                mapping: object = array("H", range(0, len(self.palette)))
+                new_index: int = self.get_palette_index(runtime_id)
+                for palette_index in replaced_indices:
+                    mapping[palette_index] = new_index
+                for start, end in block_storage.get_box_slices(x_from, y_from, z_from, x_to, y_to, z_to):
+                    self.blocks[start:end] = array("H", map(mapping.__getitem__, self.blocks[start:end]))
+
+    def get_box(self, x_from: int, y_from: int, z_from: int, x_to: int, y_to: int, z_to: int) -> object:
+        block_storage.check_bounds(x_from, y_from, z_from)
+        block_storage.check_bounds(x_to - 1, y_to - 1, z_to - 1)
+        blocks: object = array("H")
+        for start, end in block_storage.get_box_slices(x_from, y_from, z_from, x_to, y_to, z_to):
+            blocks.extend(self.blocks[start:end])
+        return array("I", map(self.palette.__getitem__, blocks))
+
+    def set_box(self, x_from: int, y_from: int, z_from: int, x_to: int, y_to: int, z_to: int, runtime_ids: object) -> None:
+        block_storage.check_bounds(x_from, y_from, z_from)
+        block_storage.check_bounds(x_to - 1, y_to - 1, z_to - 1)
+        if x_from == 0 and y_from == 0 and z_from == 0 and x_to == 16 and y_to == 16 and z_to == 16:
+            self.set_runtime_ids(runtime_ids)
+        else:
+            for runtime_id in set(runtime_ids):
+                self.get_palette_index(runtime_id)
+            blocks: object = array("H", map(self.palette_lookup.__getitem__, runtime_ids))
+            position: int = 0
+            for start, end in block_storage.get_box_slices(x_from, y_from, z_from, x_to, y_to, z_to):
+                self.blocks[start:end] = blocks[position:position + (end - start)]
+                position += end - start
+
+    def is_empty(self) -> bool:
+        air_runtime_id: int = block_storage.get_air_runtime_id()
+        for palette_index, runtime_id in enumerate(self.palette):
+            if runtime_id != air_runtime_id and palette_index in self.blocks:
+                return False
+        return True
+
+    def get_runtime_ids(self) -> object:
+        return array("I", map(self.palette.__getitem__, self.blocks))
+
+    def set_runtime_ids(self, runtime_ids: object) -> None:
+        self.palette: list = list(dict.fromkeys(runtime_ids))
+        if len(self.palette) == 0:
+            self.palette: list = [block_storage.get_air_runtime_id()]
+        self.rebuild_palette_lookup()
+        if len(runtime_ids) == 4096:
+            self.blocks: object = array("H", map(self.palette_lookup.__getitem__, runtime_ids))
+        else:
+            self.blocks: object = array("H", bytes(8192))
             
     def get_highest_block_at(self, x: int, z: int) -> int:
         block_storage.check_bounds(x, 15, z)
+        air_runtime_id: int = block_storage.get_air_runtime_id()
+        start: int = block_storage.get_index(x, 0, z)
         for y in range(15, -1, -1):
-            index: int = block_storage.get_index(x, y, z)
-            palette_index: int = self.blocks[index]
-            runtime_id: int = self.palette[palette_index]
-            if runtime_id != air().runtime_id:
+            if self.palette[self.blocks[start + y]] != air_runtime_id:
                 return y
         return -1
     
+    def raw_deserialize(self, stream: object) -> None:
+        palette: object = array("I")
+        palette.frombytes(stream.read(stream.read_unsigned_int_le() << 2))
+        blocks: object = array("H")
+        if len(palette) > 1:
+            blocks.frombytes(stream.read(8192))
+        else:
+            blocks.frombytes(bytes(8192))
+        if sys.byteorder == "big":
+            palette.byteswap()
+            blocks.byteswap()
+        self.palette: list = palette.tolist()
+        self.rebuild_palette_lookup()
+        self.blocks: object = blocks
+
+    def raw_serialize(self, palette_ids: dict = None) -> bytes:
+        if palette_ids is None:
+            palette: object = array("I", self.palette)
+        else:
+            palette: object = array("I", map(palette_ids.__getitem__, self.palette))
+        blocks: object = array("H", self.blocks)
+        if sys.byteorder == "big":
+            palette.byteswap()
+            blocks.byteswap()
+        if len(palette) > 1:
+            return binary_converter.write_unsigned_int_le(len(palette)) + palette.tobytes() + blocks.tobytes()
+        return binary_converter.write_unsigned_int_le(len(palette)) + palette.tobytes()
+    
     def network_deserialize(self, stream: object) -> None:
-        bits_per_block: int = self.read_unsigned_byte() >> 1
+        bits_per_block: int = stream.read_unsigned_byte() >> 1
         blocks_per_word: int = math.floor(32 / bits_per_block)
         words_per_chunk: int = math.ceil(4096 / blocks_per_word)
-        pos: int = 0
-        for chunk in range(0, words_per_chunk):
-            word: int = self.read_unsigned_int_le()
-            for block in range(0, blocks_per_word):
-                if pos >= 4096:
-                    break
-                state: int = (word >> (bits_per_block * block)) & ((1 << bits_per_block) - 1)
-                self.blocks[pos] = state
-                pos += 1
+        self.blocks: object = chunk_utils.unpack_words(stream.read(words_per_chunk << 2), bits_per_block)
         self.palette: list = []
-        for i in range(0, self.read_signed_var_int()):
-            self.palette.append(self.read_signed_var_int())
+        for i in range(0, stream.read_signed_var_int()):
+            self.palette.append(stream.read_signed_var_int())
+        self.rebuild_palette_lookup()
 
     def network_serialize(self, stream: object) -> None:
         bits_per_block: int = max(math.ceil(math.log2(len(self.palette))), 1)
@@ -82,18 +228,7 @@ class block_storage:
                 bits_per_block: int = bits
                 break
         stream.write_unsigned_byte((bits_per_block << 1) | 1)
-        blocks_per_word: int = math.floor(32 / bits_per_block)
-        words_per_chunk: int = math.ceil(4096 / blocks_per_word)
-        pos: int = 0
-        for chunk in range(0, words_per_chunk):
-            word: int = 0
-            for block in range(0, blocks_per_word):
-                if pos >= 4096:
-                    break
-                state: int = self.blocks[pos]
-                word |= state << (bits_per_block * block)
-                pos += 1
-            stream.write_unsigned_int_le(word)
+        stream.write(chunk_utils.pack_words(self.blocks, bits_per_block))
         stream.write_signed_var_int(len(self.palette))
         for runtime_id in self.palette:
             stream.write_signed_var_int(runtime_id)
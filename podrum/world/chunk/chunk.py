@@ -13,7 +13,10 @@
 #                                                       #
 #########################################################
 
+from array import array
+from binary_utils.binary_converter import binary_converter
 from binary_utils.binary_stream import binary_stream
+from podrum.world.chunk.block_storage import block_storage
 from podrum.world.chunk.sub_chunk import sub_chunk
 
 class chunk:
@@ -21,6 +24,7 @@ class chunk:
         self.x: int = x
         self.z: int = z
         self.has_changed: bool = False
+        self.revision: int = 0
         self.sub_chunks: dict = {}
         for y in range(0, 16):
             if y in self.sub_chunks:
@@ -47,6 +51,80 @@ class chunk:
     def set_block_runtime_id(self, x: int, y: int, z: int, runtime_id: int, layer: int = 0) -> None:
         self.sub_chunks[y >> 4].set_block_runtime_id(x & 0x0f, y & 0x0f, z & 0x0f, runtime_id, layer)
         self.has_changed: bool = True
+        self.revision += 1
+
+
+    def fill_column(self, x: int, z: int, y_from: int, y_to: int, runtime_id: int, layer: int = 0) -> None:
+        y_from: int = max(y_from, 0)
+        y_to: int = min(y_to, 256)
+        if y_to > y_from:
+            for i in range(y_from >> 4, ((y_to - 1) >> 4) + 1):
+                self.sub_chunks[i].fill_column(x & 0x0f, z & 0x0f, y_from - (i << 4), y_to - (i << 4), runtime_id, layer)
+            self.has_changed: bool = True
+            self.revision += 1
+
+    def fill_layer(self, y: int, runtime_id: int, layer: int = 0) -> None:
+        self.sub_chunks[y >> 4].fill_layer(y & 0x0f, runtime_id, layer)
+        self.has_changed: bool = True
+        self.revision += 1
+
+
+    @staticmethod
+    def get_sub_chunk_ranges(y_from: int, y_to: int) -> list:
+        y_from: int = max(y_from, 0)
+        y_to: int = min(y_to, 256)
+        if y_to <= y_from:
+            return []
+        return [(i, max(y_from - (i << 4), 0), min(y_to - (i << 4), 16)) for i in range(y_from >> 4, ((y_to - 1) >> 4) + 1)]
+
+    def fill_box(self, x_from: int, y_from: int, z_from: int, x_to: int, y_to: int, z_to: int, runtime_id: int, layer: int = 0) -> None:
+        sub_chunk_ranges: list = chunk.get_sub_chunk_ranges(y_from, y_to)
+        if x_to > x_from and z_to > z_from and len(sub_chunk_ranges) > 0:
+            for i, sub_y_from, sub_y_to in sub_chunk_ranges:
+                self.sub_chunks[i].fill_box(x_from, sub_y_from, z_from, x_to, sub_y_to, z_to, runtime_id, layer)
+            self.has_changed: bool = True
+            self.revision += 1
+
+    def replace_box(self, x_from: int, y_from: int, z_from: int, x_to: int, y_to: int, z_to: int, runtime_ids: set, runtime_id: int, layer: int = 0) -> None:
+        sub_chunk_ranges: list = chunk.get_sub_chunk_ranges(y_from, y_to)
+        if x_to > x_from and z_to > z_from and len(sub_chunk_ranges) > 0:
+            for i, sub_y_from, sub_y_to in sub_chunk_ranges:
+                self.sub_chunks[i].replace_box(x_from, sub_y_from, z_from, x_to, sub_y_to, z_to, runtime_ids, runtime_id, layer)
+            self.has_changed: bool = True
+            self.revision += 1
+
+    # The runtime ids of a box are ordered by x, then z, then y,
+    # blocks above or below the world are air.
+    def get_box(self, x_from: int, y_from: int, z_from: int, x_to: int, y_to: int, z_to: int, layer: int = 0) -> object:
+        size_y: int = y_to - y_from
+        runtime_ids: object = array("I", [block_storage.get_air_runtime_id()]) * (max(x_to - x_from, 0) * max(size_y, 0) * max(z_to - z_from, 0))
+        if len(runtime_ids) > 0:
+            for i, sub_y_from, sub_y_to in chunk.get_sub_chunk_ranges(y_from, y_to):
+                sub_runtime_ids: object = self.sub_chunks[i].get_box(x_from, sub_y_from, z_from, x_to, sub_y_to, z_to, layer)
+                sub_size_y: int = sub_y_to - sub_y_from
+                offset: int = (i << 4) + sub_y_from - y_from
+                for column in range(0, len(runtime_ids) // size_y):
+                    start: int = (column * size_y) + offset
+                    runtime_ids[start:start + sub_size_y] = sub_runtime_ids[column * sub_size_y:(column + 1) * sub_size_y]
+        return runtime_ids
+
+    def set_box(self, x_from: int, y_from: int, z_from: int, x_to: int, y_to: int, z_to: int, runtime_ids: object, layer: int = 0) -> None:
+        size_y: int = y_to - y_from
+        sub_chunk_ranges: list = chunk.get_sub_chunk_ranges(y_from, y_to)
+        if len(runtime_ids) > 0 and len(sub_chunk_ranges) > 0:
+            for i, sub_y_from, sub_y_to in sub_chunk_ranges:
+                sub_size_y: int = sub_y_to - sub_y_from
+                offset: int = (i << 4) + sub_y_from - y_from
+                if sub_size_y == size_y:
+                    sub_runtime_ids: object = runtime_ids
+                else:
+                    sub_runtime_ids: object = array("I")
+                    for column in range(0, len(runtime_ids) // size_y):
+                        start: int = (column * size_y) + offset
+                        sub_runtime_ids.extend(runtime_ids[start:start + sub_size_y])
+                self.sub_chunks[i].set_box(x_from, sub_y_from, z_from, x_to, sub_y_to, z_to, sub_runtime_ids, layer)
+            self.has_changed: bool = True
+            self.revision += 1
             
     def get_highest_block_at(self, x: int, z: int, layer: int = 0) -> int:
         for i in range(15, -1, -1):
@@ -55,6 +133,21 @@ class chunk:
                 return index + (i << 4)
         return -1
     
+    def raw_deserialize(self, data: bytes) -> None:
+        stream: object = binary_stream(data)
+        for y in range(0, stream.read_unsigned_byte()):
+            sc: object = sub_chunk()
+            sc.raw_deserialize(stream)
+            self.sub_chunks[y] = sc
+        self.biomes: list = list(stream.read(256))
+
+    def raw_serialize(self, palette_ids: dict = None) -> bytes:
+        data: list = [binary_converter.write_unsigned_byte(len(self.sub_chunks))]
+        for sc in self.sub_chunks.values():
+            data.append(sc.raw_serialize(palette_ids))
+        data.append(bytes(self.biomes))
+        return b"".join(data)
+    
     def network_deserialize(self, data: bytes) -> None:
         stream: object = binary_stream(data)
         sub_chunk_count: int = stream.read_var_int()
@@ -13,6 +13,7 @@
 #                                                       #
 #########################################################
 
+from binary_utils.binary_converter import binary_converter
 from podrum.world.chunk.block_storage import block_storage
 
 class sub_chunk:
@@ -38,9 +39,40 @@ class sub_chunk:
     def set_block_runtime_id(self, x: int, y: int, z: int, runtime_id: int, layer: int) -> None:
         self.get_block_storage(layer).set_block_runtime_id(x, y, z, runtime_id)
         
+    def fill_column(self, x: int, z: int, y_from: int, y_to: int, runtime_id: int, layer: int) -> None:
+        self.get_block_storage(layer).fill_column(x, z, y_from, y_to, runtime_id)
+
+    def fill_layer(self, y: int, runtime_id: int, layer: int) -> None:
+        self.get_block_storage(layer).fill_layer(y, runtime_id)
+        
+    def fill_box(self, x_from: int, y_from: int, z_from: int, x_to: int, y_to: int, z_to: int, runtime_id: int, layer: int) -> None:
+        self.get_block_storage(layer).fill_box(x_from, y_from, z_from, x_to, y_to, z_to, runtime_id)
+
+    def replace_box(self, x_from: int, y_from: int, z_from: int, x_to: int, y_to: int, z_to: int, runtime_ids: set, runtime_id: int, layer: int) -> None:
+        self.get_block_storage(layer).replace_box(x_from, y_from, z_from, x_to, y_to, z_to, runtime_ids, runtime_id)
+
+    def get_box(self, x_from: int, y_from: int, z_from: int, x_to: int, y_to: int, z_to: int, layer: int) -> object:
+        return self.get_block_storage(layer).get_box(x_from, y_from, z_from, x_to, y_to, z_to)
+
+    def set_box(self, x_from: int, y_from: int, z_from: int, x_to: int, y_to: int, z_to: int, runtime_ids: object, layer: int) -> None:
+        self.get_block_storage(layer).set_box(x_from, y_from, z_from, x_to, y_to, z_to, runtime_ids)
+        
     def get_highest_block_at(self, x: int, z: int, layer: int) -> int:
         return self.get_block_storage(layer).get_highest_block_at(x, z)
 
+    def raw_deserialize(self, stream: object) -> None:
+        self.block_storages: dict = {}
+        for i in range(0, stream.read_unsigned_byte()):
+            storage: object = block_storage()
+            storage.raw_deserialize(stream)
+            self.block_storages[i] = storage
+
+    def raw_serialize(self, palette_ids: dict = None) -> bytes:
+        data: list = [binary_converter.write_unsigned_byte(len(self.block_storages))]
+        for storage in self.block_storages.values():
+            data.append(storage.raw_serialize(palette_ids))
+        return b"".join(data)
+
     def network_deserialize(self, stream: object) -> None:
         version: int = stream.read_unsigned_byte()
         if version != 8:
@@ -0,0 +1,72 @@
+#########################################################
+#  ____           _                                     #
+# |  _ \ ___   __| |_ __ _   _ _ __ ___                 #
+# | |_) / _ \ / _` | '__| | | | '_ ` _ \                #
+# |  __/ (_) | (_| | |  | |_| | | | | | |               #
+# |_|   \___/ \__,_|_|   \__,_|_| |_| |_|               #
+#                                                       #
+# Copyright 2021 Podrum Team.                           #
+#                                                       #
+# This file is licensed under the GPL v2.0 license.     #
+# The license file is located in the root directory     #
+# of the source code. If not you may not use this file. #
+#                                                       #
+#########################################################
+
+from collections import OrderedDict
+from threading import Lock
+
+class chunk_cache:
+    def __init__(self, max_size: int) -> None:
+        self.max_size: int = max_size
+        self.size: int = 0
+        self.entries: object = OrderedDict()
+        self.lock: object = Lock()
+
+    # [get]
+    # :return: = bytes
+    # Gets the cached payload of a chunk if it
+    # was encoded at the given revision.
+    def get(self, x: int, z: int, revision: int) -> bytes:
+        with self.lock:
+            entry: tuple = self.entries.get((x, z))
+            if entry is not None and entry[0] == revision:
+                self.entries.move_to_end((x, z))
+                return entry[1]
+
+    # [put]
+    # :return: = None
+    # Caches the payload of a chunk and evicts
+    # the least recently used payloads.
+    def put(self, x: int, z: int, revision: int, data: bytes) -> None:
+        if len(data) > self.max_size:
+            return
+        with self.lock:
+            self.discard(x, z)
+            self.entries[(x, z)] = (revision, data)
+            self.size += len(data)
+            while self.size > self.max_size:
+                self.size -= len(self.entries.popitem(False)[1][1])
+
+    # [remove]
+    # :return: = None
+    # Removes the payload of a chunk.
+    def remove(self, x: int, z: int) -> None:
+        with self.lock:
+            self.discard(x, z)
+
+    # [discard]
+    # :return: = None
+    # Removes an entry, the lock must be held.
+    def discard(self, x: int, z: int) -> None:
+        entry: tuple = self.entries.pop((x, z), None)
+        if entry is not None:
+            self.size -= len(entry[1])
+
+    # [clear]
+    # :return: = None
+    # Removes every cached payload.
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+            self.size: int = 0
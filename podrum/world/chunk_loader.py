@@ -0,0 +1,84 @@
+#########################################################
+#  ____           _                                     #
+# |  _ \ ___   __| |_ __ _   _ _ __ ___                 #
+# | |_) / _ \ / _` | '__| | | | '_ ` _ \                #
+# |  __/ (_) | (_| | |  | |_| | | | | | |               #
+# |_|   \___/ \__,_|_|   \__,_|_| |_| |_|               #
+#                                                       #
+# Copyright 2021 Podrum Team.                           #
+#                                                       #
+# This file is licensed under the GPL v2.0 license.     #
+# The license file is located in the root directory     #
+# of the source code. If not you may not use this file. #
+#                                                       #
+#########################################################
+
+from concurrent.futures import Future
+import itertools
+from queue import PriorityQueue
+from threading import Lock
+from threading import Thread
+
+class chunk_loader:
+    def __init__(self, world: object, worker_count: int) -> None:
+        self.world: object = world
+        self.queue: object = PriorityQueue()
+        self.futures: dict = {}
+        self.priorities: dict = {}
+        self.lock: object = Lock()
+        self.counter: object = itertools.count()
+        self.workers: list = []
+        for i in range(0, max(worker_count, 1)):
+            worker: object = Thread(target = self.work, daemon = True)
+            worker.start()
+            self.workers.append(worker)
+
+    # [request]
+    # :return: = Future
+    # Queues a chunk to be loaded, chunks with a lower
+    # priority are loaded first. Requests for a chunk
+    # that is already queued share the same future.
+    def request(self, x: int, z: int, priority: int = 0) -> object:
+        with self.lock:
+            future: object = self.futures.get((x, z))
+            if future is None:
+                future: object = Future()
+                self.futures[(x, z)] = future
+            elif priority >= self.priorities[(x, z)]:
+                return future
+            self.priorities[(x, z)] = priority
+            self.queue.put((priority, next(self.counter), x, z))
+            return future
+
+    # [work]
+    # :return: = None
+    # The main function of a worker thread.
+    def work(self) -> None:
+        while True:
+            priority, count, x, z = self.queue.get()
+            if x is None:
+                break
+            with self.lock:
+                future: object = self.futures.get((x, z))
+                if future is None or future.running() or future.done():
+                    continue
+                if not future.set_running_or_notify_cancel():
+                    del self.futures[(x, z)]
+                    del self.priorities[(x, z)]
+                    continue
+            try:
+                future.set_result(self.world.read_chunk(x, z))
+            except Exception as error:
+                future.set_exception(error)
+            finally:
+                with self.lock:
+                    del self.futures[(x, z)]
+                    del self.priorities[(x, z)]
+
+    # [stop]
+    # :return: = None
+    # Stops every worker once the queued
+    # chunks are loaded.
+    def stop(self) -> None:
+        for worker in self.workers:
+            self.queue.put((float("inf"), next(self.counter), None, None))
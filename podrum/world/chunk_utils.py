@@ -13,7 +13,15 @@
 #                                                       #
 #########################################################
 
+from array import array
+import sys
+
 class chunk_utils:
+    low_nibble_table: bytes = bytes(i & 0x0f for i in range(0, 256))
+    high_nibble_table: bytes = bytes(i >> 4 for i in range(0, 256))
+    shift_nibble_table: bytes = bytes((i << 4) & 0xff for i in range(0, 256))
+    radius_offsets: dict = {}
+
     @staticmethod
     def get_nibble_4(items: list, index: int) -> int:
         if index % 2 == 0:
@@ -23,6 +31,78 @@ class chunk_utils:
     @staticmethod
     def set_nibble_4(items: list, index: int, value: int) -> list:
         if index % 2 == 0:
-            items[index >> 1] = chunk_utils.get_nibble_4(items, index - 1) << 4 | value
+            byte: int = (items[index >> 1] & 0xf0) | (value & 0x0f)
         else:
-            items[index >> 1] = value << 4 | chunk_utils.get_nibble_4(items, index + 1)
+            byte: int = ((value & 0x0f) << 4) | (items[index >> 1] & 0x0f)
+        items[index >> 1] = (byte ^ 0x80) - 0x80
+
+    @staticmethod
+    def unpack_nibbles(data: bytes) -> bytes:
+        result: object = bytearray(len(data) << 1)
+        result[0::2] = data.translate(chunk_utils.low_nibble_table)
+        result[1::2] = data.translate(chunk_utils.high_nibble_table)
+        return bytes(result)
+
+    @staticmethod
+    def pack_nibbles(data: bytes) -> bytes:
+        low: int = int.from_bytes(data[0::2], "little")
+        high: int = int.from_bytes(data[1::2].translate(chunk_utils.shift_nibble_table), "little")
+        return (low | high).to_bytes(len(data) >> 1, "little")
+
+    # Converts between (y << 8) + (z << 4) + x and (x << 8) + (z << 4) + y
+    # ordered sections, swapping twice gives back the same data.
+    @staticmethod
+    def swap_xy(data: bytes) -> bytes:
+        result: object = bytearray(4096)
+        for i in range(0, 256):
+            result[i << 4:(i + 1) << 4] = data[((i & 0x0f) << 4) | (i >> 4)::256]
+        return bytes(result)
+
+    # Gets the x, z offsets and squared distance of every chunk
+    # within a circular radius, nearest first. The tables are
+    # cached per radius.
+    @staticmethod
+    def get_radius_offsets(radius: int) -> tuple:
+        if radius not in chunk_utils.radius_offsets:
+            offsets: list = []
+            for x in range(-radius, radius + 1):
+                for z in range(-radius, radius + 1):
+                    distance: int = (x * x) + (z * z)
+                    if distance <= radius * radius:
+                        offsets.append((x, z, distance))
+            offsets.sort(key = lambda offset: offset[2])
+            chunk_utils.radius_offsets[radius] = tuple(offsets)
+        return chunk_utils.radius_offsets[radius]
+
+    @staticmethod
+    def pack_words(indices: object, bits_per_block: int) -> bytes:
+        blocks_per_word: int = 32 // bits_per_block
+        words_per_chunk: int = -(-len(indices) // blocks_per_word)
+        raw: object = array("H", indices)
+        if sys.byteorder == "big":
+            raw.byteswap()
+        raw: bytes = raw.tobytes() + bytes(((words_per_chunk * blocks_per_word) - len(indices)) << 1)
+        lane: object = bytearray(words_per_chunk << 2)
+        packed: int = 0
+        for block in range(0, blocks_per_word):
+            lane[0::4] = raw[block << 1::blocks_per_word << 1]
+            lane[1::4] = raw[(block << 1) + 1::blocks_per_word << 1]
+            packed |= int.from_bytes(lane, "little") << (bits_per_block * block)
+        return packed.to_bytes(words_per_chunk << 2, "little")
+
+    @staticmethod
+    def unpack_words(data: bytes, bits_per_block: int, count: int = 4096) -> object:
+        blocks_per_word: int = 32 // bits_per_block
+        words_per_chunk: int = len(data) >> 2
+        packed: int = int.from_bytes(data, "little")
+        mask: int = int.from_bytes(((1 << bits_per_block) - 1).to_bytes(4, "little") * words_per_chunk, "little")
+        raw: object = bytearray((words_per_chunk * blocks_per_word) << 1)
+        for block in range(0, blocks_per_word):
+            lane: bytes = ((packed >> (bits_per_block * block)) & mask).to_bytes(words_per_chunk << 2, "little")
+            raw[block << 1::blocks_per_word << 1] = lane[0::4]
+            raw[(block << 1) + 1::blocks_per_word << 1] = lane[1::4]
+        indices: object = array("H")
+        indices.frombytes(raw[:count << 1])
+        if sys.byteorder == "big":
+            indices.byteswap()
+        return indices
@@ -20,9 +20,21 @@ from podrum.block.default.grass import grass
 from podrum.world.chunk.chunk import chunk
 import random
 import math
+from threading import Lock
 
 class Perlin:
     # probably redo this and move this to geometry/maths folder
+    instances = {}
+    instances_lock = Lock()
+
+    @staticmethod
+    def get(seed):
+        # the permutation table is only built once per seed
+        with Perlin.instances_lock:
+            if seed not in Perlin.instances:
+                Perlin.instances[seed] = Perlin(seed)
+            return Perlin.instances[seed]
+
     def __call__(self,x,y): 
         return int(sum(self.noise(x*s,y*s)*h for s,h in self.perlins)*self.avg)
     def __init__(self, seed):
@@ -43,6 +55,33 @@ class Perlin:
         v = (x if h==12 or h==14 else z) if h&12 else y
         return (u if h&1 else -u)+(v if h&2 else -v)
 
+    def noise_grid(self,x0,y0,width,depth):
+        # same values as self(x0+i,y0+j) for the whole grid, indexed i*depth+j,
+        # but the lattice lookups and fades are shared along each axis
+        # and the z axis, which is always 0 here, is left out
+        p,m,fade,grad = self.p,self.m,self.fade,self.grad
+        totals = [0]*(width*depth)
+        for s,h in self.perlins:
+            xs,ys = [],[]
+            for axis,start,size in ((xs,x0,width),(ys,y0,depth)):
+                for i in range(size):
+                    c = (start+i)*s
+                    cf = math.floor(c)
+                    c -= cf
+                    axis.append((cf%m,c,c-1,fade(c)))
+            index = 0
+            for X,x,x1,u in xs:
+                pX,pX1 = p[X],p[X+1]
+                for Y,y,y1,v in ys:
+                    A,B = pX+Y,pX1+Y
+                    a,b = grad(p[p[A]],x,y,0),grad(p[p[B]],x1,y,0)
+                    c,d = grad(p[p[A+1]],x,y1,0),grad(p[p[B+1]],x1,y1,0)
+                    a += u*(b-a)
+                    c += u*(d-c)
+                    totals[index] += (a+v*(c-a))*h
+                    index += 1
+        return [int(total*self.avg) for total in totals]
+
     def noise(self,x,y,z=0):
         p,fade,lerp,grad = self.p,self.fade,self.lerp,self.grad
         xf,yf,zf = math.floor(x),math.floor(y),math.floor(z)
@@ -62,36 +101,64 @@ class Perlin:
 
 class default:
     generator_name: str = "default"
+    # Default: 62, Reduced to 20 for faster load time
+    sea_level: int = 20
+    seed: int = 2151901553968352745
+
+    runtime_ids: tuple = ()
 
     @staticmethod
-    def generate(chunk_x: int, chunk_z: int, world: object) -> object:
+    def get_runtime_ids() -> tuple:
+        if len(default.runtime_ids) == 0:
+            default.runtime_ids: tuple = (bedrock().runtime_id, stone().runtime_id, dirt().runtime_id, grass().runtime_id)
+        return default.runtime_ids
+
+    @staticmethod
+    def generate_chunk(chunk_x: int, chunk_z: int, runtime_ids: tuple) -> object:
+        bedrock_runtime_id, stone_runtime_id, dirt_runtime_id, grass_runtime_id = runtime_ids
         result: object = chunk(chunk_x, chunk_z)
-        spawn_position: object = world.get_spawn_position()
-        # Default: 62, Reduced to 20 for faster load time
-        sea_level: int = 20
-        seed: int = 2151901553968352745
+        sea_level: int = default.sea_level
 
         # generates perlin noise
-        perlin = Perlin(seed = seed)
+        heights = Perlin.get(default.seed).noise_grid(chunk_x << 4, chunk_z << 4, 16, 16)
 
         # chunk generation
         for x in range(0, 16):
             for z in range(0, 16):
-                y = perlin((chunk_x << 4) + x, (chunk_z << 4) + z)
-                result.set_block_runtime_id(x, sea_level + y, z, grass().runtime_id)
+                y = sea_level + heights[(x << 4) + z]
+                result.set_block_runtime_id(x, y, z, grass_runtime_id)
 
                 # fills in gaps underneath grass
-                for i in range(sea_level + y + 1):
-                    if (sea_level + (y - i)) == 0: 
-                        result.set_block_runtime_id(x, (sea_level + (y - i)), z, bedrock().runtime_id)
-                    elif (sea_level + (y - i)) <= 2: 
-                        result.set_block_runtime_id(x, (sea_level + (y - i)), z, random.choice([bedrock().runtime_id, stone().runtime_id]))
-                    elif (i <= 2): 
-                        result.set_block_runtime_id(x, (sea_level + (y - i)) - 1, z, dirt().runtime_id)
-                    else: 
-                        result.set_block_runtime_id(x, (sea_level + (y - i)) - 1, z, stone().runtime_id)
+                result.fill_column(x, z, 3, y - 3, stone_runtime_id)
+                result.fill_column(x, z, y - 3, y, dirt_runtime_id)
+                for i in range(min(y, 2), 0, -1):
+                    result.set_block_runtime_id(x, i, z, random.choice([bedrock_runtime_id, stone_runtime_id]))
+                result.set_block_runtime_id(x, 0, z, bedrock_runtime_id)
+        return result
 
+    # Runs in a generation process, the pool loads block_map
+    # in every process so chunks can be built there.
+    @staticmethod
+    def generate_raw(chunk_x: int, chunk_z: int, runtime_ids: tuple) -> bytes:
+        return default.generate_chunk(chunk_x, chunk_z, runtime_ids).raw_serialize()
+
+    @staticmethod
+    def update_spawn_position(chunk_x: int, chunk_z: int, world: object) -> None:
+        spawn_position: object = world.get_spawn_position()
         if chunk_x == spawn_position.x >> 4 and chunk_z == spawn_position.z:
             spawn_position.y = 256
             world.set_spawn_position(spawn_position)
+
+    @staticmethod
+    def generate(chunk_x: int, chunk_z: int, world: object) -> object:
+        result: object = default.generate_chunk(chunk_x, chunk_z, default.get_runtime_ids())
+        default.update_spawn_position(chunk_x, chunk_z, world)
+        return result
+
+    @staticmethod
+    def generate_in_pool(chunk_x: int, chunk_z: int, world: object, pool: object) -> object:
+        result: object = chunk(chunk_x, chunk_z)
+        result.raw_deserialize(pool.submit(default.generate_raw, chunk_x, chunk_z, default.get_runtime_ids()).result())
+        result.has_changed: bool = True
+        default.update_spawn_position(chunk_x, chunk_z, world)
         return result
\ No newline at end of file
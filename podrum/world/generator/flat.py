@@ -20,17 +20,23 @@ from podrum.world.chunk.chunk import chunk
 
 class flat:
     generator_name: str = "flat"
+    runtime_ids: tuple = ()
+
+    @staticmethod
+    def get_runtime_ids() -> tuple:
+        if len(flat.runtime_ids) == 0:
+            flat.runtime_ids: tuple = (bedrock().runtime_id, dirt().runtime_id, grass().runtime_id)
+        return flat.runtime_ids
     
     @staticmethod
     def generate(chunk_x: int, chunk_z: int, world: object) -> object:
+        bedrock_runtime_id, dirt_runtime_id, grass_runtime_id = flat.get_runtime_ids()
         result: object = chunk(chunk_x, chunk_z)
         spawn_position: object = world.get_spawn_position()
-        for x in range(0, 16):
-            for z in range(0, 16):
-                result.set_block_runtime_id(x, 0, z, bedrock().runtime_id)
-                result.set_block_runtime_id(x, 1, z, dirt().runtime_id)
-                result.set_block_runtime_id(x, 2, z, dirt().runtime_id)
-                result.set_block_runtime_id(x, 3, z, grass().runtime_id)
+        result.fill_layer(0, bedrock_runtime_id)
+        result.fill_layer(1, dirt_runtime_id)
+        result.fill_layer(2, dirt_runtime_id)
+        result.fill_layer(3, grass_runtime_id)
         if chunk_x == spawn_position.x >> 4 and chunk_z == spawn_position.z:
             spawn_position.y = 4
             world.set_spawn_position(spawn_position)
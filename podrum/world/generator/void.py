@@ -18,15 +18,20 @@ from podrum.world.chunk.chunk import chunk
 
 class void:
     generator_name: str = "void"
+    runtime_ids: tuple = ()
+
+    @staticmethod
+    def get_runtime_ids() -> tuple:
+        if len(void.runtime_ids) == 0:
+            void.runtime_ids: tuple = (stone().runtime_id,)
+        return void.runtime_ids
     
     @staticmethod
     def generate(chunk_x: int, chunk_z: int, world: object) -> object:
         result: object = chunk(chunk_x, chunk_z)
         spawn_position: object = world.get_spawn_position()
         if chunk_x == spawn_position.x >> 4 and chunk_z == spawn_position.z:
-            for x in range(0, 16):
-                for z in range(0, 16):
-                    result.set_block_runtime_id(x, 0, z, stone().runtime_id)
+            result.fill_layer(0, void.get_runtime_ids()[0])
             spawn_position.y = 1
             world.set_spawn_position(spawn_position)
         return result
@@ -13,6 +13,8 @@
 #                                                       #
 #########################################################
 
+from array import array
+from concurrent.futures import ThreadPoolExecutor
 import gzip
 from nbt_utils.tag_ids import tag_ids
 from nbt_utils.tag.byte_tag import byte_tag
@@ -29,16 +31,18 @@ from nbt_utils.tag.string_tag import string_tag
 from nbt_utils.utils.nbt_be_binary_stream import nbt_be_binary_stream
 import os
 from podrum.block.block_map import block_map
-from podrum.game_data.mcbe.block_id_map import block_id_map
 from podrum.geometry.vector_3 import vector_3
 from podrum.world.chunk.block_storage import block_storage
 from podrum.world.chunk.chunk import chunk as server_chunk
 from podrum.world.chunk.sub_chunk import sub_chunk
 from podrum.world.chunk_utils import chunk_utils
 from podrum.world.provider.anvil.chunk import chunk
+from podrum.world.provider.anvil.section import section
 from podrum.world.provider.anvil.region import region
+from podrum.world.provider.anvil.region_manager import region_manager
 import random
 import sys
+from threading import Lock
 import time
 
 class anvil:
@@ -51,9 +55,16 @@ class anvil:
             os.mkdir(self.world_dir)
         if not os.path.isfile(os.path.join(self.world_dir, "level.dat")):
             self.create_options_file()
+        self.options_lock: object = Lock()
+        self.options_tag: object = self.read_options_file()
+        self.options_changed: bool = False
+        self.players_lock: object = Lock()
+        self.player_tags: dict = {}
+        self.changed_players: set = set()
         region_dir: str = os.path.join(self.world_dir, "region")
         if not os.path.isdir(region_dir):
             os.mkdir(region_dir)
+        self.region_manager: object = region_manager(region_dir, self.region_file_extension)
         player_dir: str = os.path.join(self.world_dir, "players")
         if not os.path.isdir(player_dir):
             os.mkdir(player_dir)
@@ -69,97 +80,137 @@ class anvil:
     @staticmethod
     def to_server_chunk(chunk_in: object) -> object:
         cnv_chunk: object = server_chunk(chunk_in.x, chunk_in.z)
-        for x in range(0, 16):
-            for z in range(0, 16):
-                for y in range(0, chunk_in.get_highest_block_at(x, z) + 1):
-                    block_id: int = chunk_in.get_block_id(x, y, z) & 0xff
-                    meta: int = chunk_in.get_data(x, y, z) & 0xff
-                    block_name: str = list(block_id_map.keys())[list(block_id_map.values()).index(block_id)]
-                    try:
-                        runtime_id: int = block_map.get_runtime_id(block_name, meta)
-                    except KeyError:
-                        runtime_id: int = block_map.get_runtime_id(block_name, 0)
-                    cnv_chunk.set_block_runtime_id(x, y, z, runtime_id)
+        for y, sect in chunk_in.sections.items():
+            block_ids: bytes = array("b", sect.block_ids).tobytes()
+            if block_ids == bytes(4096):
+                continue
+            metas: bytes = chunk_utils.unpack_nibbles(array("b", sect.data_entries).tobytes())
+            cnv_chunk.sub_chunks[y].get_block_storage(0).set_runtime_ids(block_map.get_runtime_ids_from_legacy(chunk_utils.swap_xy(block_ids), chunk_utils.swap_xy(metas)))
         return cnv_chunk
     
     @staticmethod
     def to_anvil_chunk(chunk_in: object) -> object:
         cnv_chunk: object = chunk(chunk_in.x, chunk_in.z)
-        for x in range(0, 16):
-            for z in range(0, 16):
-                for y in range(0, chunk_in.get_highest_block_at(x, z) + 1):
-                    legacy_id: tuple = block_map.get_name_and_meta(chunk_in.get_block_runtime_id(x, y, z))
-                    block: int = (((block_id_map[legacy_id[0]] >> 7) * 128) ^ block_id_map[legacy_id[0]]) - ((block_id_map[legacy_id[0]] >> 7) * 128)
-                    meta: int = (((legacy_id[1] >> 7) * 128) ^ legacy_id[1]) - ((legacy_id[1] >> 7) * 128)
-                    cnv_chunk.set_block_id(x, y, z, block)
-                    cnv_chunk.set_data(x, y, z, meta)
+        for y, sc in chunk_in.sub_chunks.items():
+            storage: object = sc.get_block_storage(0)
+            if storage.is_empty():
+                continue
+            block_ids, metas = block_map.get_legacy_from_palette(storage.palette, storage.blocks)
+            cnv_chunk.sections[y] = section(array("b", chunk_utils.swap_xy(block_ids)).tolist(), array("b", chunk_utils.pack_nibbles(chunk_utils.swap_xy(metas))).tolist())
         return cnv_chunk
     
     def get_chunk(self, x: int, z: int) -> object:
-        region_index: tuple = anvil.cr_index(x, z)
-        chunk_index: tuple = anvil.rc_index(x, z)
-        region_path: str = os.path.join(os.path.join(self.world_dir, "region"), f"r.{region_index[0]}.{region_index[1]}.{self.region_file_extension}")
-        reg: object = region(region_path)
-        chunk_data: bytes = reg.get_chunk_data(chunk_index[0], chunk_index[1])
+        chunk_data: bytes = self.region_manager.get_chunk_data(x, z)
         if len(chunk_data) > 0:
             result: object = chunk(x, z)
             result.nbt_deserialize(chunk_data)
             return anvil.to_server_chunk(result)
                                         
     def set_chunk(self, chunk_in: object) -> None:
-        region_index: tuple = anvil.cr_index(chunk_in.x, chunk_in.z)
-        chunk_index: tuple = anvil.rc_index(chunk_in.x, chunk_in.z)
-        region_path: str = os.path.join(os.path.join(self.world_dir, "region"), f"r.{region_index[0]}.{region_index[1]}.{self.region_file_extension}")
-        reg: object = region(region_path)
-        reg.put_chunk_data(chunk_index[0], chunk_index[1], anvil.to_anvil_chunk(chunk_in).nbt_serialize())
-                                        
-    def get_option(self, name: str) -> object:
+        self.region_manager.put_chunk_data(chunk_in.x, chunk_in.z, self.to_anvil_chunk(chunk_in).nbt_serialize())
+
+    def encode_chunk(self, chunk_in: object) -> bytes:
+        return region.encode_chunk_data(self.to_anvil_chunk(chunk_in).nbt_serialize())
+
+    def set_chunks(self, chunks: list) -> None:
+        regions: dict = {}
+        with ThreadPoolExecutor() as pool:
+            for chunk_in, chunk_data in zip(chunks, pool.map(self.encode_chunk, chunks)):
+                region_index: tuple = anvil.cr_index(chunk_in.x, chunk_in.z)
+                if region_index not in regions:
+                    regions[region_index] = []
+                regions[region_index].append((chunk_in.x, chunk_in.z, chunk_data))
+        for region_index, entries in regions.items():
+            self.region_manager.put_encoded_chunks_data(region_index[0], region_index[1], entries)
+
+    def close(self) -> None:
+        self.region_manager.close()
+        self.save_options()
+        self.save_players()
+
+    # Writes to a temporary file first so a crash
+    # never leaves a half written file behind.
+    @staticmethod
+    def write_file_atomically(path: str, data: bytes) -> None:
+        with open(f"{path}.tmp", "wb") as file:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(f"{path}.tmp", path)
+        
+    def read_options_file(self) -> object:
         with open(os.path.join(self.world_dir, "level.dat"), "rb") as file:
             stream: object = nbt_be_binary_stream(gzip.decompress(file.read()))
             file.close()
-            tag: object = stream.read_root_tag()
-            return tag.get_tag("Data").get_tag(name).value
+            return stream.read_root_tag()
+                                        
+    def get_option(self, name: str) -> object:
+        with self.options_lock:
+            return self.options_tag.get_tag("Data").get_tag(name).value
                                         
     def set_option(self, name: str, value: object) -> None:
-        with open(os.path.join(self.world_dir, "level.dat"), "rb") as file:
-            stream: object = nbt_be_binary_stream(gzip.decompress(file.read()))
-            file.close()
-            tag: object = stream.read_root_tag()
-            data_tag: bytes = tag.get_tag("Data")
+        with self.options_lock:
+            data_tag: object = self.options_tag.get_tag("Data")
             if data_tag.has_tag(name):
                 option_tag: object = data_tag.get_tag(name)
                 option_tag.value = value
                 data_tag.set_tag(option_tag)
-                tag.set_tag(data_tag)
-                stream.buffer = b""
-                stream.pos = 0
-                stream.write_root_tag(tag)
-                with open(os.path.join(self.world_dir, "level.dat"), "wb") as file:
-                    file.write(gzip.compress(stream.data))
+                self.options_changed: bool = True
+
+    # Writes level.dat if any option has changed.
+    def save_options(self) -> None:
+        with self.options_lock:
+            if self.options_changed:
+                stream: object = nbt_be_binary_stream()
+                stream.write_root_tag(self.options_tag)
+                anvil.write_file_atomically(os.path.join(self.world_dir, "level.dat"), gzip.compress(stream.data))
+                self.options_changed: bool = False
+            
+    # Gets the cached data of a player, reading
+    # the player file the first time.
+    def load_player(self, uuid: str) -> object:
+        with self.players_lock:
+            if uuid not in self.player_tags:
+                with open(os.path.join(self.world_dir, f"players/{uuid}.dat"), "rb") as file:
+                    stream: object = nbt_be_binary_stream(gzip.decompress(file.read()))
                     file.close()
+                    self.player_tags[uuid] = stream.read_root_tag()
+            return self.player_tags[uuid]
+
+    # Writes the changed player files and
+    # removes the player from the cache.
+    def unload_player(self, uuid: str) -> None:
+        self.save_players([uuid])
+        with self.players_lock:
+            if uuid in self.player_tags:
+                del self.player_tags[uuid]
+
+    # Writes the player files that have changed,
+    # all of them if no uuids are given.
+    def save_players(self, uuids: list = None) -> None:
+        with self.players_lock:
+            if uuids is None:
+                uuids: list = list(self.changed_players)
+            for uuid in uuids:
+                if uuid in self.changed_players:
+                    stream: object = nbt_be_binary_stream()
+                    stream.write_root_tag(self.player_tags[uuid])
+                    anvil.write_file_atomically(os.path.join(self.world_dir, f"players/{uuid}.dat"), gzip.compress(stream.data))
+                    self.changed_players.remove(uuid)
             
     def get_player_option(self, uuid: str, name: str) -> object:
-        with open(os.path.join(self.world_dir, f"players/{uuid}.dat"), "rb") as file:
-            stream: object = nbt_be_binary_stream(gzip.decompress(file.read()))
-            file.close()
-            tag: object = stream.read_root_tag()
+        tag: object = self.load_player(uuid)
+        with self.players_lock:
             return tag.get_tag(name).value
     
     def set_player_option(self, uuid: str, name: str, value: object) -> None:
-        with open(os.path.join(self.world_dir, f"players/{uuid}.dat"), "rb") as file:
-            stream: object = nbt_be_binary_stream(gzip.decompress(file.read()))
-            file.close()
-            tag: object = stream.read_root_tag()
+        tag: object = self.load_player(uuid)
+        with self.players_lock:
             if tag.has_tag(name):
                 option_tag: object = tag.get_tag(name)
                 option_tag.value = value
                 tag.set_tag(option_tag)
-                stream.buffer = b""
-                stream.pos = 0
-                stream.write_root_tag(tag)
-                with open(os.path.join(self.world_dir, f"players/{uuid}.dat"), "wb") as file:
-                    file.write(gzip.compress(stream.data))
-                    file.close()
+                self.changed_players.add(uuid)
             
     def get_spawn_position(self) -> object:
         return vector_3(self.get_option("SpawnX"), self.get_option("SpawnY"), self.get_option("SpawnZ"))
@@ -205,12 +256,12 @@ class anvil:
         self.set_player_option(uuid, "playerGameType", gamemode)
         
     def has_player_file(self, uuid: str) -> bool:
-        if os.path.isfile(os.path.join(self.world_dir, f"players/{uuid}.dat")):
+        if uuid in self.player_tags or os.path.isfile(os.path.join(self.world_dir, f"players/{uuid}.dat")):
             return True
         return False
         
     def create_player_file(self, uuid: str) -> None:
-        stream: object = nbt_be_binary_stream()
+        spawn_position: object = self.get_spawn_position()
         tag: object = compound_tag("", [
             byte_tag("OnGround", 1),
             byte_tag("Sleeping", 0),
@@ -238,9 +289,9 @@ class anvil:
                 double_tag("", 0)
             ], tag_ids.double_tag),
             list_tag("Pos", [
-                double_tag("", self.get_spawn_position().x),
-                double_tag("", self.get_spawn_position().y),
-                double_tag("", self.get_spawn_position().z)
+                double_tag("", spawn_position.x),
+                double_tag("", spawn_position.y),
+                double_tag("", spawn_position.z)
             ], tag_ids.double_tag),
             list_tag("Rotation", [
                 float_tag("", 0),
@@ -248,10 +299,9 @@ class anvil:
                 float_tag("", 0)
             ], tag_ids.float_tag)
         ])
-        stream.write_root_tag(tag)
-        with open(os.path.join(self.world_dir, f"players/{uuid}.dat"), "wb") as file:
-            file.write(gzip.compress(stream.data))
-            file.close()
+        with self.players_lock:
+            self.player_tags[uuid] = tag
+            self.changed_players.add(uuid)
     
     def create_options_file(self) -> None:
         stream: object = nbt_be_binary_stream()
@@ -13,10 +13,13 @@
 #                                                       #
 #########################################################
 
+from array import array
 from binary_utils.binary_converter import binary_converter
 import gzip
 import math
 import os
+import sys
+from threading import Lock
 import time
 import zlib
 
@@ -32,24 +35,85 @@ class region:
             with open(path, "wb") as file:
                 file.write(b"\x00" * 8192)
                 file.close()
+        self.lock: object = Lock()
+        self.file: object = None
+        self.open()
+        self.file.seek(0)
+        header: bytes = self.file.read(8192)
+        header += b"\x00" * (8192 - len(header))
+        self.locations: object = array("I", header[:4096])
+        self.timestamps: object = array("I", header[4096:])
+        if sys.byteorder == "little":
+            self.locations.byteswap()
+            self.timestamps.byteswap()
+        self.build_sector_map()
 
     @staticmethod
     def get_location(x: int, z: int) -> int:
         return 4 * ((x & 31) + (z & 31) * 32)
 
+    # Marks the header and every sector that
+    # belongs to a chunk as used.
+    def build_sector_map(self) -> None:
+        self.file.seek(0, 2)
+        self.sectors: object = bytearray(max(math.ceil(self.file.tell() / 4096), 2))
+        self.sectors[0:2] = b"\x01\x01"
+        for location in self.locations:
+            offset: int = location >> 8
+            sector_count: int = location & 0xff
+            if offset >= 2 and sector_count > 0:
+                if offset + sector_count > len(self.sectors):
+                    self.sectors.extend(bytes(offset + sector_count - len(self.sectors)))
+                self.sectors[offset:offset + sector_count] = b"\x01" * sector_count
+
+    # Finds the first run of free sectors that is long
+    # enough or the end of the file and marks it as used.
+    def allocate_sectors(self, sector_count: int) -> int:
+        offset: int = self.sectors.find(b"\x00" * sector_count, 2)
+        if offset == -1:
+            offset: int = len(self.sectors)
+            while offset > 2 and self.sectors[offset - 1] == 0:
+                offset -= 1
+            self.sectors.extend(bytes(offset + sector_count - len(self.sectors)))
+        self.sectors[offset:offset + sector_count] = b"\x01" * sector_count
+        return offset
+
+    def free_sectors(self, offset: int, sector_count: int) -> None:
+        if offset >= 2:
+            self.sectors[offset:offset + sector_count] = bytes(sector_count)
+
+    # Writes the location and timestamp of a chunk.
+    def write_header_entry(self, index: int, location: int, timestamp: int) -> None:
+        self.locations[index] = location
+        self.timestamps[index] = timestamp
+        self.file.seek(index << 2)
+        self.file.write(binary_converter.write_unsigned_int_be(location))
+        self.file.seek(4096 + (index << 2))
+        self.file.write(binary_converter.write_unsigned_int_be(timestamp))
+
+    def open(self) -> None:
+        if self.file is None:
+            self.file: object = open(self.path, "r+b")
+
+    def close(self) -> None:
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file: object = None
+
     def get_chunk_data(self, x: int, z: int) -> bytes:
-        file: object = open(self.path, "rb")
-        index_location: int = region.get_location(x, z)
-        file.seek(index_location)
-        offset: int = binary_converter.read_unsigned_triad_be(file.read(3))
-        sector_count: int = binary_converter.read_unsigned_byte(file.read(1))
-        if offset == 0 and sector_count == 0:
-            return b""
-        file.seek(offset << 12)
-        length: int = binary_converter.read_unsigned_int_be(file.read(4))
-        compression_type: int = binary_converter.read_unsigned_byte(file.read(1))
-        chunk_data: bytes = file.read(length)
-        file.close()
+        with self.lock:
+            location: int = self.locations[region.get_location(x, z) >> 2]
+            offset: int = location >> 8
+            sector_count: int = location & 0xff
+            if offset == 0 and sector_count == 0:
+                return b""
+            self.open()
+            self.file.seek(offset << 12)
+            data: bytes = self.file.read(sector_count << 12)
+        length: int = binary_converter.read_unsigned_int_be(data[:4])
+        compression_type: int = data[4]
+        chunk_data: bytes = data[5:5 + length]
         if compression_type == 1:
             return gzip.decompress(chunk_data)
         if compression_type == 2:
@@ -57,8 +121,10 @@ class region:
         if compression_type == 3:
             return chunk_data
 
-    def put_chunk_data(self, x: int, z: int, chunk_data: bytes, compression_type: int = 2) -> None:
-        file: object = open(self.path, "r+b")
+    # Compresses chunk data and pads it to whole sectors,
+    # this does not need the lock so it can run in parallel.
+    @staticmethod
+    def encode_chunk_data(chunk_data: bytes, compression_type: int = 2) -> bytes:
         if compression_type == 1:
             cc: bytes = gzip.compress(chunk_data)
         elif compression_type == 2:
@@ -66,67 +132,93 @@ class region:
         elif compression_type == 3:
             cc: bytes = chunk_data
         else:
-            return
+            return b""
         ccc: bytes = binary_converter.write_unsigned_int_be(len(cc))
         ccc += binary_converter.write_unsigned_byte(compression_type)
         ccc += cc
         size: int = math.ceil(len(ccc) / 4096)
+        if size > 0xff:
+            raise Exception("Chunk data is too large for a region file.")
         remaining: int = (size << 12) - len(ccc)
         ccc += b"\x00" * remaining
-        index_location: int = region.get_location(x, z)
-        index_location_data: bytes = b""
-        timestamp_data: bytes = b""
-        chunks_data: bytes = b""
-        offset: int = 2
-        for i in range(0, 1024):
-            if i == (index_location >> 2):
-                sector_count: int = size
-                index_location_data += binary_converter.write_unsigned_triad_be(offset)
-                index_location_data += binary_converter.write_unsigned_byte(sector_count)
-                timestamp_data += binary_converter.write_unsigned_int_be(int(time.time()))
-                chunks_data += ccc
-                offset += sector_count
-            else:
-                file.seek(i << 2)
-                chunk_offset: int = binary_converter.read_unsigned_triad_be(file.read(3))
-                sector_count: int = binary_converter.read_unsigned_byte(file.read(1))
-                if chunk_offset > 0 and sector_count > 0:
-                    index_location_data += binary_converter.write_unsigned_triad_be(offset)
-                    index_location_data += binary_converter.write_unsigned_byte(sector_count)
-                    offset += sector_count
-                    file.seek((i << 2) + 4096)
-                    timestamp_data += file.read(4)
-                    file.seek(chunk_offset << 12)
-                    chunks_data += file.read(sector_count << 12)
-                else:
-                    index_location_data += b"\x00" * 4
-                    timestamp_data += b"\x00" * 4
-        file.seek(0)
-        file.write(index_location_data + timestamp_data + chunks_data)
-        file.close()
+        return ccc
+
+    # Writes an encoded chunk to its sectors, the
+    # lock must be held and the file must be open.
+    def write_chunk_data(self, x: int, z: int, ccc: bytes, timestamp: int) -> None:
+        index: int = region.get_location(x, z) >> 2
+        size: int = len(ccc) >> 12
+        offset: int = self.locations[index] >> 8
+        sector_count: int = self.locations[index] & 0xff
+        if offset >= 2 and sector_count >= size:
+            self.free_sectors(offset + size, sector_count - size)
+        else:
+            self.free_sectors(offset, sector_count)
+            offset: int = self.allocate_sectors(size)
+        self.file.seek(offset << 12)
+        self.file.write(ccc)
+        self.locations[index] = (offset << 8) | size
+        self.timestamps[index] = timestamp
         
+    def put_chunk_data(self, x: int, z: int, chunk_data: bytes, compression_type: int = 2) -> None:
+        ccc: bytes = region.encode_chunk_data(chunk_data, compression_type)
+        if len(ccc) == 0:
+            return
+        index: int = region.get_location(x, z) >> 2
+        with self.lock:
+            self.open()
+            self.write_chunk_data(x, z, ccc, int(time.time()))
+            self.write_header_entry(index, self.locations[index], self.timestamps[index])
+            self.file.flush()
+
+    # Writes many encoded chunks and commits the
+    # header once for all of them.
+    def put_encoded_chunks_data(self, entries: list) -> None:
+        timestamp: int = int(time.time())
+        with self.lock:
+            self.open()
+            for x, z, ccc in entries:
+                if len(ccc) > 0:
+                    self.write_chunk_data(x, z, ccc, timestamp)
+            self.write_header()
+            self.file.flush()
+
+    def write_header(self) -> None:
+        header_locations: object = array("I", self.locations)
+        header_timestamps: object = array("I", self.timestamps)
+        if sys.byteorder == "little":
+            header_locations.byteswap()
+            header_timestamps.byteswap()
+        self.file.seek(0)
+        self.file.write(header_locations.tobytes() + header_timestamps.tobytes())
+
     def remove_chunk_data(self, x: int, z: int) -> None:
-        file: object = open(self.path, "r+b")
-        index_location: int = self.get_location(x, z)
-        index_location_data: bytes = b""
-        timestamp_data: bytes = b""
-        chunks_data: bytes = b""
-        offset: int = 2
-        for i in range(0, 1024):
-            file.seek(i << 2)
-            chunk_offset: int = binary_converter.read_unsigned_triad_be(file.read(3))
-            sector_count: int = binary_converter.read_unsigned_byte(file.read(1))
-            if chunk_offset > 0 and sector_count > 0 and i != (index_location >> 2):
-                index_location_data += binary_converter.write_unsigned_triad_be(offset)
-                index_location_data += binary_converter.write_unsigned_byte(sector_count)
-                offset += sector_count
-                file.seek((i << 2) + 4096)
-                timestamp_data += file.read(4)
-                file.seek(chunk_offset << 12)
-                chunks_data += file.read(sector_count << 12)
-            else:
-                index_location_data += b"\x00" * 4
-                timestamp_data += b"\x00" * 4
-        file.seek(0)
-        file.write(index_location_data + timestamp_data + chunks_data)
-        file.close()
+        index: int = region.get_location(x, z) >> 2
+        with self.lock:
+            self.open()
+            self.free_sectors(self.locations[index] >> 8, self.locations[index] & 0xff)
+            self.write_header_entry(index, 0, 0)
+            self.file.flush()
+
+    # Rewrites the region file without any free
+    # sectors, should only be used offline.
+    def compact(self) -> None:
+        with self.lock:
+            self.open()
+            locations: object = array("I", bytes(4096))
+            chunks_data: list = []
+            offset: int = 2
+            for i in range(0, 1024):
+                chunk_offset: int = self.locations[i] >> 8
+                sector_count: int = self.locations[i] & 0xff
+                if chunk_offset >= 2 and sector_count > 0:
+                    self.file.seek(chunk_offset << 12)
+                    chunks_data.append(self.file.read(sector_count << 12))
+                    locations[i] = (offset << 8) | sector_count
+                    offset += sector_count
+            self.locations: object = locations
+            self.write_header()
+            self.file.write(b"".join(chunks_data))
+            self.file.truncate()
+            self.file.flush()
+            self.build_sector_map()
@@ -0,0 +1,126 @@
+#########################################################
+#  ____           _                                     #
+# |  _ \ ___   __| |_ __ _   _ _ __ ___                 #
+# | |_) / _ \ / _` | '__| | | | '_ ` _ \                #
+# |  __/ (_) | (_| | |  | |_| | | | | | |               #
+# |_|   \___/ \__,_|_|   \__,_|_| |_| |_|               #
+#                                                       #
+# Copyright 2021 Podrum Team.                           #
+#                                                       #
+# This file is licensed under the GPL v2.0 license.     #
+# The license file is located in the root directory     #
+# of the source code. If not you may not use this file. #
+#                                                       #
+#########################################################
+
+from collections import OrderedDict
+import os
+from podrum.world.provider.anvil.region import region
+from threading import Lock
+
+class region_manager:
+    max_open_regions: int = 64
+
+    def __init__(self, path: str, file_extension: str) -> None:
+        self.path: str = path
+        self.file_extension: str = file_extension
+        self.regions: object = OrderedDict()
+        self.users: dict = {}
+        self.lock: object = Lock()
+
+    # [acquire]
+    # :return: = object
+    # Gets an open region and marks it as in use
+    # so it is not closed while being accessed.
+    def acquire(self, x: int, z: int) -> object:
+        with self.lock:
+            if (x, z) in self.regions:
+                self.regions.move_to_end((x, z))
+                reg: object = self.regions[(x, z)]
+            else:
+                reg: object = region(os.path.join(self.path, f"r.{x}.{z}.{self.file_extension}"))
+                self.regions[(x, z)] = reg
+                self.users[(x, z)] = 0
+            self.users[(x, z)] += 1
+            return reg
+
+    # [release]
+    # :return: = None
+    # Marks a region as no longer in use and closes
+    # the least recently used idle regions.
+    def release(self, x: int, z: int) -> None:
+        with self.lock:
+            self.users[(x, z)] -= 1
+            for key in list(self.regions):
+                if len(self.regions) <= self.max_open_regions:
+                    break
+                if self.users[key] == 0:
+                    self.regions.pop(key).close()
+                    del self.users[key]
+
+    # [get_chunk_data]
+    # :return: = bytes
+    # Reads the data of a chunk.
+    def get_chunk_data(self, x: int, z: int) -> bytes:
+        reg: object = self.acquire(x >> 5, z >> 5)
+        try:
+            return reg.get_chunk_data(x, z)
+        finally:
+            self.release(x >> 5, z >> 5)
+
+    # [put_chunk_data]
+    # :return: = None
+    # Writes the data of a chunk.
+    def put_chunk_data(self, x: int, z: int, chunk_data: bytes, compression_type: int = 2) -> None:
+        reg: object = self.acquire(x >> 5, z >> 5)
+        try:
+            reg.put_chunk_data(x, z, chunk_data, compression_type)
+        finally:
+            self.release(x >> 5, z >> 5)
+
+    # [put_encoded_chunks_data]
+    # :return: = None
+    # Writes many encoded chunks of one region
+    # and commits the region header once.
+    def put_encoded_chunks_data(self, x: int, z: int, entries: list) -> None:
+        reg: object = self.acquire(x, z)
+        try:
+            reg.put_encoded_chunks_data(entries)
+        finally:
+            self.release(x, z)
+
+    # [remove_chunk_data]
+    # :return: = None
+    # Removes the data of a chunk.
+    def remove_chunk_data(self, x: int, z: int) -> None:
+        reg: object = self.acquire(x >> 5, z >> 5)
+        try:
+            reg.remove_chunk_data(x, z)
+        finally:
+            self.release(x >> 5, z >> 5)
+
+    # [compact]
+    # :return: = None
+    # Compacts every region file in the directory,
+    # this should only be done while the world is offline.
+    def compact(self) -> None:
+        for file_name in os.listdir(self.path):
+            file_name_shards: list = file_name.split(".")
+            if len(file_name_shards) == 4 and file_name_shards[0] == "r" and file_name_shards[3] == self.file_extension:
+                x: int = int(file_name_shards[1])
+                z: int = int(file_name_shards[2])
+                reg: object = self.acquire(x, z)
+                try:
+                    reg.compact()
+                finally:
+                    self.release(x, z)
+
+    # [close]
+    # :return: = None
+    # Closes every open region.
+    def close(self) -> None:
+        with self.lock:
+            for reg in self.regions.values():
+                reg.close()
+            self.regions.clear()
+            self.users.clear()
@@ -0,0 +1,97 @@
+#########################################################
+#  ____           _                                     #
+# |  _ \ ___   __| |_ __ _   _ _ __ ___                 #
+# | |_) / _ \ / _` | '__| | | | '_ ` _ \                #
+# |  __/ (_) | (_| | |  | |_| | | | | | |               #
+# |_|   \___/ \__,_|_|   \__,_|_| |_| |_|               #
+#                                                       #
+# Copyright 2021 Podrum Team.                           #
+#                                                       #
+# This file is licensed under the GPL v2.0 license.     #
+# The license file is located in the root directory     #
+# of the source code. If not you may not use this file. #
+#                                                       #
+#########################################################
+
+from binary_utils.binary_converter import binary_converter
+from binary_utils.binary_stream import binary_stream
+from podrum.block.block_map import block_map
+from podrum.world.chunk.chunk import chunk
+from podrum.world.provider.anvil.anvil import anvil
+from podrum.world.provider.anvil.region import region
+
+# Collects the runtime ids of the palettes of a chunk
+# while it is serialized and numbers them in order.
+class palette_ids(dict):
+    def __missing__(self, runtime_id: int) -> int:
+        self[runtime_id] = len(self)
+        return self[runtime_id]
+
+# Stores chunks in the same palette layout the server
+# keeps in memory, so they do not have to be converted
+# to legacy block ids. Palettes point into a table of
+# block names and metas stored with every chunk, runtime
+# ids change between protocol versions. Level and player
+# data are kept in the same files as anvil worlds.
+class native(anvil):
+    provider_name: str = "native"
+    region_file_extension: str = "mcn"
+    format_version: int = 2
+    # 2 = zlib, 3 = none
+    compression_type: int = 2
+    
+    def get_chunk(self, x: int, z: int) -> object:
+        chunk_data: bytes = self.region_manager.get_chunk_data(x, z)
+        if len(chunk_data) > 0:
+            if chunk_data[0] != native.format_version:
+                raise Exception(f"Unsupported chunk format version {chunk_data[0]}.")
+            stream: object = binary_stream(chunk_data)
+            stream.pos += 1
+            runtime_ids: list = native.read_block_states(stream)
+            result: object = chunk(x, z)
+            result.raw_deserialize(chunk_data[stream.pos:])
+            for sc in result.sub_chunks.values():
+                for storage in sc.block_storages.values():
+                    storage.palette: list = [runtime_ids[palette_id] for palette_id in storage.palette]
+                    storage.rebuild_palette_lookup()
+            return result
+        
+    def set_chunk(self, chunk_in: object) -> None:
+        self.region_manager.put_chunk_data(chunk_in.x, chunk_in.z, native.to_native_data(chunk_in), self.compression_type)
+        
+    def encode_chunk(self, chunk_in: object) -> bytes:
+        return region.encode_chunk_data(native.to_native_data(chunk_in), self.compression_type)
+    
+    @staticmethod
+    def to_native_data(chunk_in: object) -> bytes:
+        ids: dict = palette_ids()
+        chunk_data: bytes = chunk_in.raw_serialize(ids)
+        return binary_converter.write_unsigned_byte(native.format_version) + native.write_block_states(ids) + chunk_data
+
+    # Writes the name and meta of every
+    # runtime id in the order of their ids.
+    @staticmethod
+    def write_block_states(ids: dict) -> bytes:
+        stream: object = binary_stream()
+        stream.write_unsigned_int_le(len(ids))
+        for runtime_id in ids:
+            block_name, meta = block_map.get_name_and_meta(runtime_id)
+            name_data: bytes = block_name.encode()
+            stream.write_unsigned_short_le(len(name_data))
+            stream.write(name_data)
+            stream.write_unsigned_short_le(meta)
+        return stream.data
+
+    # Reads the block states of a chunk as runtime ids, unknown
+    # metas fall back to meta 0 and unknown blocks to air.
+    @staticmethod
+    def read_block_states(stream: object) -> list:
+        runtime_ids: list = []
+        for i in range(0, stream.read_unsigned_int_le()):
+            block_name: str = stream.read(stream.read_unsigned_short_le()).decode()
+            meta: int = stream.read_unsigned_short_le()
+            runtime_id: int = block_map.states_1.get(f"{block_name} {meta}", -1)
+            if runtime_id == -1:
+                runtime_id: int = block_map.states_1.get(f"{block_name} 0", block_map.get_runtime_id("minecraft:air", 0))
+            runtime_ids.append(runtime_id)
+        return runtime_ids
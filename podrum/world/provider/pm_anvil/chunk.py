@@ -89,9 +89,18 @@ class chunk:
         return -1
     
     def recalculate_height_map(self) -> None:
+        sections: list = []
+        for i in range(15, -1, -1):
+            if i in self.sections and any(self.sections[i].block_ids):
+                sections.append((i, self.sections[i]))
         for x in range(0, 16):
             for z in range(0, 16):
-                y: int = self.get_highest_block_at(x, z) + 1
+                y: int = 0
+                for i, section_to_check in sections:
+                    index: int = section_to_check.get_highest_block_at(x, z)
+                    if index != -1:
+                        y: int = index + (i << 4) + 1
+                        break
                 self.height_map[(x << 4) + z] = (((y >> 7) * 128) ^ y) - ((y >> 7) * 128)
                     
     def nbt_serialize(self) -> bytes:
@@ -99,7 +108,10 @@ class chunk:
         self.recalculate_height_map()
         sections: list = list_tag("Sections", [], tag_ids.compound_tag)
         for i, sect in self.sections.items():
+            if not any(sect.block_ids):
+                continue
             sections.value.append(compound_tag("", [
+                byte_tag("Y", i),
                 byte_array_tag("Blocks", sect.block_ids),
                 byte_array_tag("Data", sect.data_entries),
                 byte_array_tag("BlockLight", sect.block_light_entries),
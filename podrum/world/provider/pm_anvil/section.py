@@ -70,7 +70,9 @@ class section:
         
     def get_highest_block_at(self, x: int, z: int) -> int:
         section.check_bounds(x, 15, z)
+        start: int = section.get_index(x, 0, z)
+        column: list = self.block_ids[start:start + 16]
         for y in range(15, -1, -1):
-            if self.get_block_id(x, y, z) != 0:
+            if column[y] != 0:
                 return y
         return -1
@@ -14,4 +14,5 @@
 #########################################################
 
 from podrum.world.provider.anvil.anvil import anvil
+from podrum.world.provider.native.native import native
 from podrum.world.provider.pm_anvil.pm_anvil import pm_anvil
\ No newline at end of file
@@ -13,92 +13,236 @@
 #                                                       #
 #########################################################
 
-from collections import deque
+from array import array
+from concurrent.futures import Future
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import wait
 import math
 from podrum.block.block_map import block_map
 from podrum.geometry.vector_2 import vector_2
-from podrum.task.immediate_task import immediate_task
+from podrum.protocol.mcbe.packet.game_packet import game_packet
+from podrum.protocol.mcbe.packet.level_chunk_packet import level_chunk_packet
+from podrum.world.chunk.block_storage import block_storage
+from podrum.world.chunk_cache import chunk_cache
+from podrum.world.chunk_loader import chunk_loader
+from podrum.world.chunk_utils import chunk_utils
+from threading import Lock
+import time
 
 class world:
     def __init__(self, provider: object, server: object):
         self.provider: object = provider
         self.server: object = server
         self.chunks: dict = {}
-        self.mark_as_loading: object = deque()
+        self.chunk_times: dict = {}
+        self.unloading_chunks: dict = {}
+        self.unload_tasks: list = []
+        self.pinned_chunks: list = []
+        self.pin_lock: object = Lock()
         self.world_path: str = provider.world_dir
+        self.chunk_cache: object = chunk_cache(server.config.data["chunk_cache_size"] * 1024 * 1024)
+        self.chunk_loader: object = chunk_loader(self, server.config.data["chunk_loader_workers"])
+        if server.config.data["generator_processes"] > 0:
+            self.generation_pool: object = ProcessPoolExecutor(server.config.data["generator_processes"], initializer = block_map.load_map)
+        else:
+            self.generation_pool: object = None
     
+    # [read_chunk]
+    # :return: = object
+    # Reads a chunk from the provider or generates
+    # it and adds it to the loaded chunks.
+    def read_chunk(self, x: int, z: int) -> object:
+        chunk: object = self.chunks.get((x, z))
+        if chunk is not None:
+            return chunk
+        chunk: object = self.unloading_chunks.get((x, z))
+        if chunk is None:
+            chunk: object = self.provider.get_chunk(x, z)
+        if chunk is None:
+            generator: object = self.server.managers.generator_manager.get_generator(self.get_generator_name())
+            if self.generation_pool is not None and hasattr(generator, "generate_in_pool"):
+                chunk: object = generator.generate_in_pool(x, z, self, self.generation_pool)
+            else:
+                chunk: object = generator.generate(x, z, self)
+        self.chunk_times[(x, z)] = time.monotonic()
+        self.chunks[(x, z)] = chunk
+        return chunk
+
+    # [request_chunk]
+    # :return: = Future
+    # Requests a chunk from the chunk loader.
+    def request_chunk(self, x: int, z: int, priority: int = 0) -> object:
+        chunk: object = self.chunks.get((x, z))
+        if chunk is not None:
+            future: object = Future()
+            future.set_result(chunk)
+            return future
+        return self.chunk_loader.request(x, z, priority)
+
+    # [get_chunk_payload]
+    # :return: = bytes
+    # Gets the encoded level chunk packet of a chunk
+    # from the chunk cache or encodes and caches it.
+    def get_chunk_payload(self, chunk: object) -> bytes:
+        revision: int = chunk.revision
+        payload: bytes = self.chunk_cache.get(chunk.x, chunk.z, revision)
+        if payload is None:
+            packet: object = level_chunk_packet()
+            packet.chunk_x = chunk.x
+            packet.chunk_z = chunk.z
+            packet.chunk_data = chunk.network_serialize()
+            packet.encode()
+            new_packet: object = game_packet()
+            new_packet.write_packet_data(packet.data)
+            new_packet.encode()
+            payload: bytes = new_packet.data
+            self.chunk_cache.put(chunk.x, chunk.z, revision, payload)
+        return payload
+
+    # [request_chunk_payload]
+    # :return: = Future
+    # Gets the encoded level chunk packet of a chunk, chunks
+    # that are not cached are encoded on the task pool so
+    # the tick thread does not have to.
+    def request_chunk_payload(self, chunk: object) -> object:
+        payload: bytes = self.chunk_cache.get(chunk.x, chunk.z, chunk.revision)
+        if payload is None:
+            return self.server.managers.task_manager.run_task(self.get_chunk_payload, [chunk]).future
+        future: object = Future()
+        future.set_result(payload)
+        return future
+
     # [load_chunk]
     # :return: = None
     # Loads a chunk.
     def load_chunk(self, x: int, z: int) -> None:
-        if f"{x} {z}" not in self.mark_as_loading:
-            self.mark_as_loading.append(f"{x} {z}")
-            chunk: object = self.provider.get_chunk(x, z)
-            if chunk is None:
-                generator: object = self.server.managers.generator_manager.get_generator(self.get_generator_name())
-                chunk: object = generator.generate(x, z, self)
-            self.chunks[f"{x} {z}"] = chunk
-            self.mark_as_loading.remove(f"{x} {z}")
+        self.request_chunk(x, z).result()
+
+    # [get_radius_chunks]
+    # :return: = list
+    # Gets the x, z and squared distance of every chunk
+    # in a circular radius, sorted by distance to the center.
+    def get_radius_chunks(self, x: int, z: int, radius: int) -> list:
+        center_x: int = math.floor(x) >> 4
+        center_z: int = math.floor(z) >> 4
+        return [(center_x + offset_x, center_z + offset_z, distance) for offset_x, offset_z, distance in chunk_utils.get_radius_offsets(radius)]
+
+    # [request_radius]
+    # :return: = list
+    # Requests every chunk of a radius, the returned
+    # futures are sorted by distance to the center.
+    def request_radius(self, x: int, z: int, radius: int) -> list:
+        futures: list = []
+        for chunk_x, chunk_z, distance in self.get_radius_chunks(x, z, radius):
+            futures.append(self.request_chunk(chunk_x, chunk_z, distance))
+        return futures
     
     # [load_radius]
     # :return: = None
     # Loads a radius.
     def load_radius(self, x: int, z: int, radius: int) -> None:
-        tasks: list = []
-        chunk_x_start: int = (math.floor(x) >> 4) - radius
-        chunk_x_end: int = (math.floor(x) >> 4) + radius
-        chunk_z_start: int = (math.floor(z) >> 4) - radius
-        chunk_z_end: int = (math.floor(z) >> 4) + radius
-        for chunk_x in range(chunk_x_start, chunk_x_end):
-            for chunk_z in range(chunk_z_start, chunk_z_end):
-                if not self.has_loaded_chunk(chunk_x, chunk_z):
-                    chunk_task: object = immediate_task(self.load_chunk, [chunk_x, chunk_z])
-                    chunk_task.start()
-                    tasks.append(chunk_task)
-        for task in tasks:
-            task.join()
+        for future in self.request_radius(x, z, radius):
+            future.result()
     
     # [send_radius]
     # :return: = None
     # Sends a radius to a player.
     def send_radius(self, x: int, z: int, radius: int, player: object) -> None:
-        self.load_radius(x, z, radius)
-        tasks: list = []
-        chunk_x_start: int = (math.floor(x) >> 4) - radius
-        chunk_x_end: int = (math.floor(x) >> 4) + radius
-        chunk_z_start: int = (math.floor(z) >> 4) - radius
-        chunk_z_end: int = (math.floor(z) >> 4) + radius
-        for chunk_x in range(chunk_x_start, chunk_x_end):
-            for chunk_z in range(chunk_z_start, chunk_z_end):
-                if self.has_loaded_chunk(chunk_x, chunk_z):
-                    chunk: object = self.get_chunk(chunk_x, chunk_z)
-                    send_task: object = immediate_task(player.send_chunk, [chunk])
-                    send_task.start()
-                    tasks.append(send_task)
-        for task in tasks:
-            task.join()
+        for future in self.request_radius(x, z, radius):
+            player.send_chunk(future.result())
         player.send_network_chunk_publisher_update()
     
     # [unload_chunk]
     # :return: = None
     # Unloads a chunk.
     def unload_chunk(self, x: int, z: int) -> None:
-        self.provider.save_chunk(x, z)
-        del self.chunks[f"{x} {z}"]
+        self.unload_chunks([(x, z)])
+        
+    # [unload_chunks]
+    # :return: = None
+    # Unloads chunks, changed chunks are saved in the background
+    # and are reused if they are loaded again before that ends.
+    # Pinned chunks are kept.
+    def unload_chunks(self, keys: list) -> None:
+        changed_chunks: list = []
+        with self.pin_lock:
+            pinned_chunks: set = set().union(*self.pinned_chunks)
+            for key in keys:
+                chunk: object = self.chunks.get(key)
+                if chunk is not None and key not in pinned_chunks:
+                    if chunk.has_changed:
+                        self.unloading_chunks[key] = chunk
+                        changed_chunks.append(chunk)
+                    del self.chunks[key]
+                    self.chunk_times.pop(key, None)
+                    self.chunk_cache.remove(chunk.x, chunk.z)
+        if len(changed_chunks) > 0:
+            self.unload_tasks: list = [task_obj for task_obj in self.unload_tasks if not task_obj.future.done()]
+            self.unload_tasks.append(self.server.managers.task_manager.run_task(self.save_unloaded_chunks, [changed_chunks]))
+
+    def save_unloaded_chunks(self, chunks: list) -> None:
+        try:
+            self.save_chunks(chunks)
+        finally:
+            for chunk in chunks:
+                self.unloading_chunks.pop((chunk.x, chunk.z), None)
+
+    # [get_viewed_chunks]
+    # :return: = set
+    # Gets the chunks that players in this world
+    # have been sent or are waiting for.
+    def get_viewed_chunks(self) -> set:
+        viewed_chunks: set = set()
+        for player in list(self.server.players.values()):
+            if player.world is self:
+                viewed_chunks.update(list(player.sent_chunks))
+                viewed_chunks.update(list(player.chunk_queue))
+        return viewed_chunks
+
+    # [collect_chunks]
+    # :return: = None
+    # Unloads the chunks no player has seen for chunk_unload_delay
+    # seconds, then the least recently seen chunks that are
+    # not in view until max_loaded_chunks is not exceeded.
+    def collect_chunks(self) -> None:
+        now: float = time.monotonic()
+        viewed_chunks: set = self.get_viewed_chunks()
+        for keys in list(self.pinned_chunks):
+            viewed_chunks.update(keys)
+        unload_delay: float = self.server.config.data["chunk_unload_delay"]
+        candidates: list = []
+        for key in list(self.chunks):
+            if key in viewed_chunks:
+                self.chunk_times[key] = now
+            else:
+                candidates.append((self.chunk_times.get(key, now), key))
+        candidates.sort()
+        keys: list = []
+        over_limit: int = len(self.chunks) - self.server.config.data["max_loaded_chunks"]
+        for last_seen, key in candidates:
+            if now - last_seen >= unload_delay or len(keys) < over_limit:
+                keys.append(key)
+        if len(keys) > 0:
+            self.unload_chunks(keys)
+
+    # [tick]
+    # :return: = None
+    # Collects unused chunks once a second.
+    def tick(self, current_tick: int) -> None:
+        if current_tick % 20 == 0:
+            self.collect_chunks()
 
     # [has_loaded_chunk]
     # :return: = bool
     # Checks if a chunk is loaded.
     def has_loaded_chunk(self, x: int, z: int) -> bool:
-        if f"{x} {z}" in self.chunks:
-            return True
-        return False
+        return (x, z) in self.chunks
     
     # [get_chunk]
     # :return: = object
     # Gets a chunk.
     def get_chunk(self, x: int, z: int) -> object:
-        return self.chunks[f"{x} {z}"]
+        return self.chunks[(x, z)]
         
     # [save_chunk]
     # :return: = None
@@ -110,33 +254,146 @@ class world:
     # :return: = None
     # Gets a block.
     def get_block(self, x: int, y: int, z: int, block: object) -> None:
-        block_and_meta: tuple = block_map.get_name_and_meta(self.chunks[f"{x >> 4} {z >> 4}"].get_block_runtime_id(x & 0x0f, y & 0x0f, z & 0x0f))
+        block_and_meta: tuple = block_map.get_name_and_meta(self.chunks[(x >> 4, z >> 4)].get_block_runtime_id(x & 0x0f, y, z & 0x0f))
         return self.server.managers.block_manager.get_block(block_and_meta[0], block_and_meta[1])
     
     # [set_block]
     # :return: = None
     # Sets a block.
     def set_block(self, x: int, y: int, z: int, block: object) -> None:
-        self.chunks[f"{x >> 4} {z >> 4}"].set_block_runtime_id(x & 0x0f, y & 0x0f, z & 0x0f, block.runtime_id)
+        self.chunks[(x >> 4, z >> 4)].set_block_runtime_id(x & 0x0f, y, z & 0x0f, block.runtime_id)
         
     # [get_highest_block_at]
     # :return: = int
     # Get the highest block y position.
     def get_highest_block_at(self, x: int, z: int) -> int:
-        return self.chunks[f"{x >> 4} {z >> 4}"].get_highest_block_at(x & 0x0f, z & 0x0f)
+        return self.chunks[(x >> 4, z >> 4)].get_highest_block_at(x & 0x0f, z & 0x0f)
     
+    # [get_chunk_boxes]
+    # :return: = generator
+    # Loads every chunk a box overlaps and yields each chunk
+    # with the part of the box inside it in chunk coordinates.
+    # The chunks are pinned until the iteration ends so
+    # collect_chunks does not unload them meanwhile.
+    def get_chunk_boxes(self, x_from: int, z_from: int, x_to: int, z_to: int) -> object:
+        keys: set = set()
+        if x_to > x_from and z_to > z_from:
+            for chunk_x in range(x_from >> 4, ((x_to - 1) >> 4) + 1):
+                for chunk_z in range(z_from >> 4, ((z_to - 1) >> 4) + 1):
+                    keys.add((chunk_x, chunk_z))
+        with self.pin_lock:
+            self.pinned_chunks.append(keys)
+        try:
+            futures: list = [(chunk_x, chunk_z, self.request_chunk(chunk_x, chunk_z)) for chunk_x, chunk_z in keys]
+            for chunk_x, chunk_z, future in futures:
+                yield (
+                    future.result(),
+                    max(x_from - (chunk_x << 4), 0),
+                    max(z_from - (chunk_z << 4), 0),
+                    min(x_to - (chunk_x << 4), 16),
+                    min(z_to - (chunk_z << 4), 16)
+                )
+        finally:
+            with self.pin_lock:
+                self.pinned_chunks.remove(keys)
+
+    # [fill]
+    # :return: = None
+    # Sets every block from the first position
+    # up to but not including the second one.
+    def fill(self, x_from: int, y_from: int, z_from: int, x_to: int, y_to: int, z_to: int, block: object, layer: int = 0) -> None:
+        for chunk_obj, local_x_from, local_z_from, local_x_to, local_z_to in self.get_chunk_boxes(x_from, z_from, x_to, z_to):
+            chunk_obj.fill_box(local_x_from, y_from, local_z_from, local_x_to, y_to, local_z_to, block.runtime_id, layer)
+
+    # [replace]
+    # :return: = None
+    # Replaces the given blocks from the first position
+    # up to but not including the second one.
+    def replace(self, x_from: int, y_from: int, z_from: int, x_to: int, y_to: int, z_to: int, blocks: list, block: object, layer: int = 0) -> None:
+        runtime_ids: set = set(block_obj.runtime_id for block_obj in blocks)
+        for chunk_obj, local_x_from, local_z_from, local_x_to, local_z_to in self.get_chunk_boxes(x_from, z_from, x_to, z_to):
+            chunk_obj.replace_box(local_x_from, y_from, local_z_from, local_x_to, y_to, local_z_to, runtime_ids, block.runtime_id, layer)
+
+    # [get_region]
+    # :return: = array
+    # Gets the runtime ids of every block from the first position
+    # up to but not including the second one, ordered by x, then z,
+    # then y. Blocks above or below the world are air.
+    def get_region(self, x_from: int, y_from: int, z_from: int, x_to: int, y_to: int, z_to: int, layer: int = 0) -> object:
+        size_y: int = max(y_to - y_from, 0)
+        size_z: int = max(z_to - z_from, 0)
+        runtime_ids: object = array("I", [block_storage.get_air_runtime_id()]) * (max(x_to - x_from, 0) * size_y * size_z)
+        if len(runtime_ids) > 0:
+            for chunk_obj, local_x_from, local_z_from, local_x_to, local_z_to in self.get_chunk_boxes(x_from, z_from, x_to, z_to):
+                box: object = chunk_obj.get_box(local_x_from, y_from, local_z_from, local_x_to, y_to, local_z_to, layer)
+                row_size: int = (local_z_to - local_z_from) * size_y
+                for i in range(0, local_x_to - local_x_from):
+                    start: int = ((((chunk_obj.x << 4) + local_x_from + i - x_from) * size_z) + (chunk_obj.z << 4) + local_z_from - z_from) * size_y
+                    runtime_ids[start:start + row_size] = box[i * row_size:(i + 1) * row_size]
+        return runtime_ids
+
+    # [set_region]
+    # :return: = None
+    # Sets every block from the first position up to but not
+    # including the second one to runtime ids ordered like
+    # the ones get_region returns.
+    def set_region(self, x_from: int, y_from: int, z_from: int, x_to: int, y_to: int, z_to: int, runtime_ids: object, layer: int = 0) -> None:
+        size_y: int = max(y_to - y_from, 0)
+        size_z: int = max(z_to - z_from, 0)
+        if len(runtime_ids) != max(x_to - x_from, 0) * size_y * size_z:
+            raise Exception("The runtime ids do not match the size of the region.")
+        if len(runtime_ids) > 0:
+            for chunk_obj, local_x_from, local_z_from, local_x_to, local_z_to in self.get_chunk_boxes(x_from, z_from, x_to, z_to):
+                row_size: int = (local_z_to - local_z_from) * size_y
+                box: object = array("I")
+                for i in range(0, local_x_to - local_x_from):
+                    start: int = ((((chunk_obj.x << 4) + local_x_from + i - x_from) * size_z) + (chunk_obj.z << 4) + local_z_from - z_from) * size_y
+                    box.extend(runtime_ids[start:start + row_size])
+                chunk_obj.set_box(local_x_from, y_from, local_z_from, local_x_to, y_to, local_z_to, box, layer)
+
     # [save]
     # :return: = None
-    # idk here lol
+    # Saves every changed chunk and the world options, providers
+    # that support it write all the chunks of a region at once.
     def save(self) -> None:
-        tasks: list = []
-        for chunk in self.chunks.values():
-            chunk_task: object = immediate_task(self.save_chunk, [chunk.x, chunk.z])
-            chunk_task.start()
-            tasks.append(chunk_task)
-        for task in tasks:
-            task.join()
+        self.save_chunks(list(self.chunks.values()) + list(self.unloading_chunks.values()))
+        if hasattr(self.provider, "save_options"):
+            self.provider.save_options()
+        if hasattr(self.provider, "save_players"):
+            self.provider.save_players()
+    
+    # [save_chunks]
+    # :return: = None
+    # Saves the chunks that have changed.
+    def save_chunks(self, chunks: list) -> None:
+        changed_chunks: list = []
+        revisions: list = []
+        for chunk in chunks:
+            if chunk.has_changed:
+                changed_chunks.append(chunk)
+                revisions.append(chunk.revision)
+        if len(changed_chunks) > 0:
+            if hasattr(self.provider, "set_chunks"):
+                self.provider.set_chunks(changed_chunks)
+            else:
+                for chunk in changed_chunks:
+                    self.provider.set_chunk(chunk)
+            for chunk, revision in zip(changed_chunks, revisions):
+                if chunk.revision == revision:
+                    chunk.has_changed: bool = False
     
+    # [close]
+    # :return: = None
+    # Stops the chunk loader, the generation
+    # processes and closes the provider.
+    def close(self) -> None:
+        wait([task_obj.future for task_obj in self.unload_tasks])
+        self.chunk_loader.stop()
+        if self.generation_pool is not None:
+            self.generation_pool.shutdown()
+        if hasattr(self.provider, "close"):
+            self.provider.close()
+
     # [get_world_name]
     # :return: = str
     # Gets a world name.
@@ -204,6 +461,14 @@ class world:
     def create_player(self, uuid: str) -> None:
         self.provider.create_player_file(uuid)
         
+    # [unload_player]
+    # :return: = None
+    # Saves a player's data and removes
+    # it from the provider's cache.
+    def unload_player(self, uuid: str) -> None:
+        if hasattr(self.provider, "unload_player"):
+            self.provider.unload_player(uuid)
+        
     # [has_player]
     # :return: = bool
     # Checks if a player exists.
@@ -15,7 +15,6 @@
 
 import os
 from podrum.world.world import world
-from podrum.task.immediate_task import immediate_task
 
 class world_manager:
     def __init__(self, server: object) -> None:
@@ -45,6 +44,7 @@ class world_manager:
         )
         world_name: str = world_obj.get_world_name()
         self.worlds[world_name] = world_obj
+        self.server.tick_loop.add_callback(world_obj.tick)
         self.path_to_world_name[world_path] = world_name
         spawn_pos: object = self.worlds[world_name].get_spawn_position()
         self.server.logger.info(f"Loading world -> {world_name}")
@@ -70,17 +70,24 @@ class world_manager:
     # :return: = None
     # Unloads a world
     def unload_world(self, world_name: str) -> None:
+        self.server.tick_loop.remove_callback(self.worlds[world_name].tick)
         self.worlds[world_name].save()
+        self.worlds[world_name].close()
         del self.worlds[world_name]
 
+    # [save_all]
+    # :return: = None
+    # Saves all worlds
+    def save_all(self) -> None:
+        for world_obj in list(self.worlds.values()):
+            world_obj.save()
+
     # [unload_all]
     # :return: = None
     # Unloads all worlds
     def unload_all(self) -> None:
         tasks: list = []
         for world_name in dict(self.worlds):
-            unload_task: object = immediate_task(self.unload_world, [world_name])
-            unload_task.start()
-            tasks.append(unload_task)
+            tasks.append(self.server.managers.task_manager.run_task(self.unload_world, [world_name]))
         for task in tasks:
-            task.join()
\ No newline at end of file
+            task.wait()
\ No newline at end of file